@@ -1,28 +1,145 @@
 from __future__ import annotations
 
-import json
+import atexit
+import contextlib
+import logging
+import mmap
+import os
+import shutil
+import tempfile
+import threading
 import time
-from concurrent.futures import ThreadPoolExecutor
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, wait
+from dataclasses import dataclass
 from pathlib import Path
 
-from grvt_volume_boost.playwright_compat import run_sync_playwright
+from grvt_volume_boost import json_compat
+from grvt_volume_boost.auth.session_state import write_storage_state
+from grvt_volume_boost.playwright_compat import get_stealth, run_sync_playwright
 from grvt_volume_boost.runtime import ensure_playwright_browsers_path
 from grvt_volume_boost.settings import COOKIE_CACHE_FILE, ORIGIN
 from grvt_volume_boost.i18n import tr
+from grvt_volume_boost.util import atomic_write_bytes, env_flag
+
+logger = logging.getLogger(__name__)
 
 # Cookie expires in ~25 minutes; refresh service runs every 15 minutes by default.
 DEFAULT_COOKIE_REFRESH_INTERVAL_SEC = 15 * 60
+# Refresh this long before the stored gravity cookie expires.
+_COOKIE_EXPIRY_MARGIN_SEC = 120.0
+_MIN_REFRESH_DELAY_SEC = 60.0
+
+# Below this size a plain read() is cheaper than setting up a memory map.
+_MMAP_MIN_BYTES = 64 * 1024
+
+
+
+@dataclass(frozen=True)
+class _StateIndex:
+    """Lookups derived once per storage-state version."""
+
+    gravity_cookies: tuple[dict, ...]
+    # origin -> {localStorage name: value}
+    local_storage: dict[str, dict[str, str]]
+
+
+def _index_state(state: dict) -> _StateIndex:
+    gravity = tuple(
+        c for c in state.get("cookies", []) or [] if isinstance(c, dict) and c.get("name") == "gravity" and c.get("value")
+    )
+    local_storage: dict[str, dict[str, str]] = {}
+    for entry in state.get("origins", []) or []:
+        if not isinstance(entry, dict):
+            continue
+        ls = local_storage.setdefault(entry.get("origin"), {})
+        for item in entry.get("localStorage", []) or []:
+            name = item.get("name") if isinstance(item, dict) else None
+            if name is not None and not ls.get(name):
+                ls[name] = item.get("value")
+    return _StateIndex(gravity_cookies=gravity, local_storage=local_storage)
+
+
+# Parsed storage-state keyed by resolved path -> ((mtime_ns, size), state, index). Callers must
+# treat the returned dict as read-only since it is shared across calls/threads.
+_STATE_CACHE: dict[Path, tuple[tuple[int, int], dict, _StateIndex]] = {}
+_STATE_CACHE_LOCK = threading.Lock()
+
+# Upper bound for one account's browser refresh (60s navigation + 15s cookie wait + slack).
+_REFRESH_TIMEOUT_PER_ACCOUNT_SEC = 90.0
+_REFRESH_POOL_WORKERS = max(2, (os.cpu_count() or 2) // 2)
+
+_REFRESH_POOL: ThreadPoolExecutor | None = None
+_REFRESH_POOL_LOCK = threading.Lock()
+
+
+def _refresh_pool() -> ThreadPoolExecutor:
+    """Persistent worker pool for browser refreshes (created on first use)."""
+    global _REFRESH_POOL
+    with _REFRESH_POOL_LOCK:
+        if _REFRESH_POOL is None:
+            _REFRESH_POOL = ThreadPoolExecutor(
+                max_workers=_REFRESH_POOL_WORKERS, thread_name_prefix="cookie-refresh"
+            )
+            atexit.register(_REFRESH_POOL.shutdown, wait=False)
+        return _REFRESH_POOL
+
+
+def _json_load(path: Path):
+    """Read and parse a JSON file (binary read feeds orjson directly when installed)."""
+    with open(path, "rb") as f:
+        return json_compat.loads(f.read())
+
+
+def _load_state(path: Path) -> tuple[dict, _StateIndex]:
+    """Parse a Playwright storage-state file, reusing the cached parse while the file is unchanged."""
+    key = path.resolve()
+    st = path.stat()
+    version = (st.st_mtime_ns, st.st_size)
+    with _STATE_CACHE_LOCK:
+        hit = _STATE_CACHE.get(key)
+    if hit is not None and hit[0] == version:
+        return hit[1], hit[2]
+
+    state = _parse_state(path)
+    index = _index_state(state) if isinstance(state, dict) and "origins" in state else _StateIndex((), {})
+    with _STATE_CACHE_LOCK:
+        _STATE_CACHE[key] = (version, state, index)
+    return state, index
+
+
+def _read_state(path: Path) -> dict:
+    return _load_state(path)[0]
+
+
+def _invalidate_state(path: Path) -> None:
+    with _STATE_CACHE_LOCK:
+        _STATE_CACHE.pop(path.resolve(), None)
+
+
+def _parse_state(path: Path) -> dict:
+    """Parse a state file, memory-mapping large files to avoid a full copy."""
+    with open(path, "rb") as f:
+        if f.seek(0, 2) < _MMAP_MIN_BYTES:
+            f.seek(0)
+            return json_compat.loads(f.read())
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, memoryview(mm) as buf:
+            return json_compat.loads(buf)
+
+
+def _json_dump(path: Path, obj, *, indent: bool = True) -> None:
+    atomic_write_bytes(path, json_compat.dumps(obj, indent=indent))
 
 
 def save_cookie_cache(gravity: str, *, cache_file: Path = COOKIE_CACHE_FILE) -> None:
+    ts = time.time()
     cache = {
         "gravity": gravity,
-        "timestamp": time.time(),
-        "datetime": datetime.now().isoformat(),
+        "timestamp": ts,
+        # Human-readable only; `timestamp` is authoritative.
+        "datetime": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(ts)),
     }
-    with open(cache_file, "w", encoding="utf-8") as f:
-        json.dump(cache, f, indent=2)
+    # Machine-read only; pretty-print just when debugging the cache by hand.
+    _json_dump(cache_file, cache, indent=env_flag("GRVT_DEBUG_COOKIE_CACHE"))
 
 
 def load_cookie_cache(
@@ -33,8 +150,11 @@ def load_cookie_cache(
     if not cache_file.exists():
         return None
 
-    with open(cache_file, "r", encoding="utf-8") as f:
-        cache = json.load(f)
+    try:
+        cache = _json_load(cache_file)
+    except json_compat.JSONDecodeError:
+        # Treat a corrupt cache like a miss; the caller will refresh.
+        return None
 
     age = time.time() - float(cache.get("timestamp", 0))
     if age > max_age_sec:
@@ -46,8 +166,7 @@ def load_cookie_cache(
 
 def _ensure_playwright_format(state_path: Path, origin: str) -> dict:
     """Load state file and convert to Playwright format if needed."""
-    with open(state_path, "r", encoding="utf-8") as f:
-        state = json.load(f)
+    state = _read_state(state_path)
 
     # Already Playwright format
     if "origins" in state:
@@ -79,13 +198,13 @@ def validate_state_file_ext(
     - Validates Playwright storage-state format and cookies.
     - Optionally validates presence of `localStorage['grvt_ss_on_chain']` which is required for trading.
     """
-    if not state_path.exists():
-        return False, tr("session.missing", name=state_path.name)
-
+    # Validation runs on every startup per account and is followed by a cookie lookup on the
+    # same file, so it shares the cached parse/index (one stat() when unchanged).
     try:
-        with open(state_path, "r", encoding="utf-8") as f:
-            state = json.load(f)
-    except json.JSONDecodeError:
+        state, index = _load_state(state_path)
+    except FileNotFoundError:
+        return False, tr("session.missing", name=state_path.name)
+    except json_compat.JSONDecodeError:
         return False, tr("session.invalid_json", name=state_path.name)
 
     if "origins" not in state:
@@ -98,123 +217,327 @@ def validate_state_file_ext(
 
     if require_session_key:
         # Prefer matching origin, but fall back to scanning all origins.
-        origins = state.get("origins", []) or []
-        entries = []
-        for entry in origins:
-            if entry.get("origin") == origin:
-                entries.append(entry)
-        if not entries:
-            entries = origins
-
-        found = False
-        for entry in entries:
-            for item in entry.get("localStorage", []) or []:
-                if item.get("name") == "grvt_ss_on_chain" and item.get("value"):
-                    found = True
-                    break
-            if found:
-                break
+        if origin in index.local_storage:
+            found = bool(index.local_storage[origin].get("grvt_ss_on_chain"))
+        else:
+            found = any(ls.get("grvt_ss_on_chain") for ls in index.local_storage.values())
         if not found:
             return False, tr("session.missing_session_key", name=state_path.name)
 
     return True, ""
 
 
-def get_fresh_cookie(state_path: Path, *, origin: str = ORIGIN, force_refresh: bool = False) -> str | None:
-    """Get fresh gravity cookie from stored browser session.
+def _stored_gravity(index: _StateIndex) -> str | None:
+    """Return the storage-state gravity cookie if it is present and not expired."""
+    now = time.time()
+    for c in index.gravity_cookies:
+        val = c.get("value")
+        exp = c.get("expires")
+        # If expiry is present and not expired, trust it.
+        if exp is None:
+            return str(val)
+        try:
+            exp_f = float(exp)
+        except Exception:
+            return str(val)
+        if exp_f <= 0 or exp_f > now:
+            return str(val)
+    return None
 
-    The state file must be a full Playwright state (with cookies) from a logged-in session.
-    Raw localStorage exports won't work - use QR login to create proper state.
+
+def _gravity_expiry(index: _StateIndex) -> float | None:
+    """Expiry (unix seconds) of the stored gravity cookie, or None for session/unknown expiry."""
+    for c in index.gravity_cookies:
+        try:
+            exp = float(c.get("expires"))
+        except (TypeError, ValueError):
+            continue
+        if exp > 0:
+            return exp
+    return None
+
+
+def context_gravity(context, origin: str | None = None) -> str | None:
+    """Read the gravity cookie from a live Playwright context.
+
+    With `origin`, the browser only returns cookies for that URL (smaller CDP payload).
     """
-    if not state_path.exists():
-        return None
+    cookies = context.cookies([origin]) if origin else context.cookies()
+    return {c.get("name"): c.get("value") for c in cookies}.get("gravity") or None
 
-    with open(state_path, "r", encoding="utf-8") as f:
-        state = json.load(f)
 
-    # Check if this is raw localStorage (won't work for cookie refresh)
-    if "origins" not in state:
-        return None
+def wait_for_gravity_cookie(
+    context, page, *, origin: str, timeout_sec: float, idle_check_sec: float = 1.0
+) -> str | None:
+    """Wait for the gravity cookie to appear in a browser context.
 
-    if not force_refresh:
-        # Fast path: storage-state already contains a (usually valid) gravity cookie.
-        # Avoid launching a browser on every run; it's slow and often unnecessary.
+    Instead of polling `context.cookies()` on a fixed tick, wake on each network response and
+    re-read cookies as soon as a `Set-Cookie: gravity=...` was observed via CDP. Cookies are also
+    re-read at least every `idle_check_sec` regardless of traffic, which covers cookies set from
+    JS, on requests the page's CDP session doesn't see, or when CDP is unavailable.
+    """
+    g = context_gravity(context, origin)
+    if g:
+        return g
+
+    seen: list[bool] = []
+    cdp = None
+    try:
+        cdp = context.new_cdp_session(page)
+        cdp.send("Network.enable")
+
+        def _on_extra_info(params: dict) -> None:
+            headers = params.get("headers") or {}
+            raw = headers.get("set-cookie") or headers.get("Set-Cookie") or ""
+            if "gravity=" in raw:
+                seen.append(True)
+
+        cdp.on("Network.responseReceivedExtraInfo", _on_extra_info)
+    except Exception:
+        # Without CDP only the periodic check below finds the cookie.
+        pass
+
+    try:
+        deadline = time.monotonic() + timeout_sec
+        last_check = time.monotonic()
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            try:
+                page.wait_for_event("response", timeout=min(remaining, idle_check_sec) * 1000)
+            except Exception:
+                # Idle tick, or the page went away: nothing more will arrive on it.
+                if page.is_closed():
+                    return context_gravity(context, origin)
+            now = time.monotonic()
+            if not seen and now - last_check < idle_check_sec:
+                continue
+            seen.clear()
+            last_check = now
+            g = context_gravity(context, origin)
+            if g:
+                return g
+    finally:
+        if cdp is not None:
+            try:
+                cdp.detach()
+            except Exception:
+                pass
+
+
+def _refresh_in_browser(browser, state_path: Path, state: dict, *, origin: str) -> str | None:
+    """Refresh one account in its own isolated context of an already-launched browser."""
+    context = browser.new_context(
+        storage_state=state,
+        viewport={"width": 412, "height": 915},
+        device_scale_factor=2.625,
+        is_mobile=True,
+        has_touch=True,
+        user_agent="Mozilla/5.0 (Linux; Android 14; Pixel 8 Pro) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Mobile Safari/537.36",
+        locale="en-US",
+    )
+    try:
+        page = context.new_page()
+
+        # `networkidle` can be slow/flaky due to analytics/streams; `domcontentloaded` is enough.
+        page.goto(origin, wait_until="domcontentloaded", timeout=60000)
+
+        g = wait_for_gravity_cookie(context, page, origin=origin, timeout_sec=15.0)
+
+        if g:
+            write_storage_state(state_path, context.storage_state())
+            _invalidate_state(state_path)
+        return g
+    finally:
+        context.close()
+
+
+_BROWSER_ARGS = ("--headless=new", "--disable-blink-features=AutomationControlled")
+
+
+def _devtools_endpoint(user_data_dir: Path, *, timeout_sec: float = 10.0) -> str:
+    """CDP WebSocket URL of a Chromium started with `--remote-debugging-port=0`.
+
+    Chromium picks a free port and writes it (plus the browser target path) to DevToolsActivePort.
+    """
+    port_file = user_data_dir / "DevToolsActivePort"
+    deadline = time.monotonic() + timeout_sec
+    while True:
         try:
-            now = time.time()
-            for c in state.get("cookies", []) or []:
-                if c.get("name") != "gravity":
-                    continue
-                val = c.get("value")
-                if not val:
+            port, path = port_file.read_text(encoding="utf-8").split()[:2]
+            return f"ws://127.0.0.1:{port}{path}"
+        except (OSError, ValueError):
+            if time.monotonic() >= deadline:
+                raise RuntimeError("Chromium did not report a DevTools endpoint") from None
+            time.sleep(0.05)
+
+
+@contextlib.contextmanager
+def _shared_browser():
+    """Launch one headless Chromium that other threads can attach to; yield its CDP endpoint.
+
+    Must run inside `run_sync_playwright`. The browser is closed when the block exits.
+    """
+    from playwright.sync_api import sync_playwright
+
+    ensure_playwright_browsers_path()
+    user_data_dir = Path(tempfile.mkdtemp(prefix="grvt-cookie-refresh-"))
+    try:
+        with sync_playwright() as p:
+            owner = p.chromium.launch_persistent_context(
+                str(user_data_dir), headless=True, args=[*_BROWSER_ARGS, "--remote-debugging-port=0"]
+            )
+            try:
+                yield _devtools_endpoint(user_data_dir)
+            finally:
+                owner.close()
+    finally:
+        shutil.rmtree(user_data_dir, ignore_errors=True)
+
+
+def _refresh_over_cdp(endpoint: str, state_path: Path, state: dict, *, origin: str) -> str | None:
+    """Pool-worker unit: attach to the shared browser with this thread's own Playwright client.
+
+    The sync API is bound to the thread that started it, so each worker connects separately
+    instead of sharing the launcher's `Browser` object.
+    """
+    from playwright.sync_api import sync_playwright
+
+    with sync_playwright() as p:
+        get_stealth().hook_playwright_context(p)
+        browser = p.chromium.connect_over_cdp(endpoint)
+        try:
+            return _refresh_in_browser(browser, state_path, state, origin=origin)
+        finally:
+            # Disconnects this client only; the shared browser keeps serving other workers.
+            browser.close()
+
+
+def _refresh_cookies(jobs: list[tuple[Path, dict]], *, origin: str) -> list[str | None]:
+    """Refresh gravity cookies for several accounts with a single Chromium launch.
+
+    Launching the browser dominates refresh time, so all accounts share one browser process.
+    Each account gets its own context (separate cookies/localStorage) and is driven concurrently
+    by a pool worker over CDP, so wall time stays close to a single account's refresh.
+    """
+    def _run_one() -> list[str | None]:
+        from playwright.sync_api import sync_playwright
+
+        (state_path, state), = jobs
+        ensure_playwright_browsers_path()
+        with sync_playwright() as p:
+            get_stealth().hook_playwright_context(p)
+            browser = p.chromium.launch(headless=True, args=list(_BROWSER_ARGS))
+            try:
+                return [_refresh_in_browser(browser, state_path, state, origin=origin)]
+            finally:
+                browser.close()
+
+    def _run_shared() -> list[str | None]:
+        with _shared_browser() as endpoint:
+            pool = _refresh_pool()
+            futures = [
+                pool.submit(_refresh_over_cdp, endpoint, state_path, state, origin=origin) for state_path, state in jobs
+            ]
+            # Accounts beyond the pool size queue for a free worker, one timeout per round.
+            rounds = -(-len(jobs) // _REFRESH_POOL_WORKERS)
+            _, not_done = wait(futures, timeout=_REFRESH_TIMEOUT_PER_ACCOUNT_SEC * rounds)
+            for future in not_done:
+                # Queued units never start; running ones fail fast once the browser closes below.
+                future.cancel()
+            out: list[str | None] = []
+            for (state_path, _), future in zip(jobs, futures):
+                if future in not_done:
+                    logger.error("Cookie refresh timed out for %s", state_path.name)
+                    out.append(None)
                     continue
-                exp = c.get("expires")
-                # If expiry is present and not expired, trust it.
-                if exp is None:
-                    return str(val)
                 try:
-                    exp_f = float(exp)
+                    out.append(future.result())
                 except Exception:
-                    return str(val)
-                if exp_f <= 0 or exp_f > now:
-                    return str(val)
-        except Exception:
-            pass
+                    logger.exception("Cookie refresh failed for %s", state_path.name)
+                    out.append(None)
+            return out
 
-    gravity = None
     try:
-        def _run() -> str | None:
-            from playwright.sync_api import sync_playwright
-            from playwright_stealth import Stealth
-
-            ensure_playwright_browsers_path()
-            with sync_playwright() as p:
-                stealth = Stealth()
-                stealth.hook_playwright_context(p)
-                browser = p.chromium.launch(
-                    headless=True, args=["--headless=new", "--disable-blink-features=AutomationControlled"]
-                )
-                context = browser.new_context(
-                    storage_state=state,
-                    viewport={"width": 412, "height": 915},
-                    device_scale_factor=2.625,
-                    is_mobile=True,
-                    has_touch=True,
-                    user_agent="Mozilla/5.0 (Linux; Android 14; Pixel 8 Pro) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Mobile Safari/537.36",
-                    locale="en-US",
-                )
-                page = context.new_page()
-
-                # `networkidle` can be slow/flaky due to analytics/streams; `domcontentloaded` is enough.
-                page.goto(origin, wait_until="domcontentloaded", timeout=60000)
-
-                # Wait for cookie to appear
-                start = time.time()
-                g = None
-                while time.time() - start < 15.0:
-                    cookies = context.cookies()
-                    g = next((c["value"] for c in cookies if c.get("name") == "gravity"), None)
-                    if g:
-                        break
-                    page.wait_for_timeout(500)
-
-                if g:
-                    context.storage_state(path=str(state_path))
-                browser.close()
-                return g
+        # A single account needs no CDP fan-out; launch and drive it directly.
+        return run_sync_playwright(_run_one if len(jobs) == 1 else _run_shared)
+    except Exception:
+        logger.exception("Cookie refresh failed")
+        return [None] * len(jobs)
+
+
+def _load_refreshable_state(state_path: Path) -> tuple[dict, _StateIndex] | None:
+    try:
+        state, index = _load_state(state_path)
+    except (FileNotFoundError, json_compat.JSONDecodeError):
+        return None
+    # Raw localStorage exports won't work for cookie refresh.
+    if "origins" not in state:
+        return None
+    return state, index
 
-        gravity = run_sync_playwright(_run)
-    except Exception as e:
-        import traceback
-        print(f"[Cookie Refresh] ERROR: {type(e).__name__}: {e}")
-        traceback.print_exc()
+
+def get_fresh_cookie(state_path: Path, *, origin: str = ORIGIN, force_refresh: bool = False) -> str | None:
+    """Get fresh gravity cookie from stored browser session.
+
+    The state file must be a full Playwright state (with cookies) from a logged-in session.
+    Raw localStorage exports won't work - use QR login to create proper state.
+    """
+    loaded = _load_refreshable_state(state_path)
+    if loaded is None:
         return None
+    state, index = loaded
 
-    return gravity
+    if not force_refresh:
+        # Fast path: storage-state already contains a (usually valid) gravity cookie.
+        # Avoid launching a browser on every run; it's slow and often unnecessary.
+        gravity = _stored_gravity(index)
+        if gravity:
+            return gravity
 
+    return _refresh_cookies([(state_path, state)], origin=origin)[0]
 
-def get_cookies_parallel(state_path_a: Path, state_path_b: Path) -> tuple[str | None, str | None]:
-    """Fetch cookies for two state files in parallel."""
-    with ThreadPoolExecutor(max_workers=2) as executor:
-        future_a = executor.submit(get_fresh_cookie, state_path_a)
-        future_b = executor.submit(get_fresh_cookie, state_path_b)
-        return future_a.result(), future_b.result()
+
+def get_fresh_cookie_with_ttl(state_path: Path, *, origin: str = ORIGIN) -> tuple[str | None, float]:
+    """Like `get_fresh_cookie`, but also return seconds until the next refresh is due.
+
+    The delay comes from the cookie's own expiry (minus a safety margin), so refresh loops only
+    launch a browser when the stored cookie is about to expire. A cookie already inside the
+    margin is refreshed now. Without an expiry, fall back to DEFAULT_COOKIE_REFRESH_INTERVAL_SEC.
+    """
+    loaded = _load_refreshable_state(state_path)
+    if loaded is None:
+        return None, float(DEFAULT_COOKIE_REFRESH_INTERVAL_SEC)
+    exp = _gravity_expiry(loaded[1])
+    force = exp is not None and exp - time.time() <= _COOKIE_EXPIRY_MARGIN_SEC
+
+    gravity = get_fresh_cookie(state_path, origin=origin, force_refresh=force)
+    if not gravity:
+        return None, float(DEFAULT_COOKIE_REFRESH_INTERVAL_SEC)
+
+    loaded = _load_refreshable_state(state_path)
+    exp = _gravity_expiry(loaded[1]) if loaded is not None else None
+    if exp is None:
+        return gravity, float(DEFAULT_COOKIE_REFRESH_INTERVAL_SEC)
+    return gravity, max(_MIN_REFRESH_DELAY_SEC, exp - time.time() - _COOKIE_EXPIRY_MARGIN_SEC)
+
+
+def get_cookies_parallel(*state_paths: Path) -> tuple[str | None, ...]:
+    """Fetch cookies for several state files, sharing one browser for those that need a refresh."""
+    results: list[str | None] = [None] * len(state_paths)
+    jobs: list[tuple[int, Path, dict]] = []
+    for i, path in enumerate(state_paths):
+        loaded = _load_refreshable_state(path)
+        if loaded is None:
+            continue
+        state, index = loaded
+        results[i] = _stored_gravity(index)
+        if not results[i]:
+            jobs.append((i, path, state))
+
+    if jobs:
+        refreshed = _refresh_cookies([(path, state) for _, path, state in jobs], origin=ORIGIN)
+        for (i, _, _), gravity in zip(jobs, refreshed):
+            results[i] = gravity
+    return tuple(results)
@@ -2,18 +2,19 @@
 from __future__ import annotations
 
 import base64
+import functools
 import json
+import os
+import threading
 import time
 import re
 from pathlib import Path
 from typing import Callable
 from urllib.parse import parse_qs, urlparse
 
-import cv2
-import numpy as np
-
-from grvt_volume_boost.auth.cookies import save_cookie_cache
-from grvt_volume_boost.playwright_compat import run_sync_playwright
+from grvt_volume_boost.auth.cookies import save_cookie_cache, wait_for_gravity_cookie
+from grvt_volume_boost.auth.session_state import USER_SUBACCOUNTS_QUERY, write_storage_state
+from grvt_volume_boost.playwright_compat import get_stealth, run_sync_playwright
 from grvt_volume_boost.runtime import ensure_playwright_browsers_path
 from grvt_volume_boost.settings import EDGE_URL, ORIGIN, SESSION_DIR
 
@@ -37,20 +38,144 @@ def _launch_chromium(p, *, headless: bool, args: list[str] | None = None, channe
     return p.chromium.launch(**launch_kwargs)
 
 
+_QR_MAX_UPSCALED_PX = 3000
+# Triage for the slow sweep: a flat image (low Laplacian variance) with almost no dark pixels
+# cannot contain a QR code, so skip the ~40 threshold/detector passes.
+_QR_MIN_LAPLACIAN_VAR = 50.0
+_QR_MIN_DARK_RATIO = 0.01
+
+# Button-name patterns used by the OTP helper (compiled once; it runs in polling loops).
+_SEND_CODE_RES = tuple(re.compile(label, re.I) for label in ("Send code", "Resend", "Get code", "Send", "Request code"))
+_SUBMIT_CODE_RES = tuple(re.compile(label, re.I) for label in ("Verify", "Continue", "Confirm", "Submit", "Next"))
+
+_CF_BODY_NEEDLES = (
+    "you have been blocked",
+    "attention required",
+    "checking your browser",
+    "cf-challenge",
+    "/cdn-cgi/",
+)
+_CF_BLOCK_JS = """(needles) => {
+    const title = (document.title || '').toLowerCase();
+    if (title.includes('just a moment') || title.includes('attention required')) return true;
+    const html = (document.documentElement ? document.documentElement.outerHTML : '').toLowerCase();
+    return needles.some(n => html.includes(n));
+}"""
+
+_OTP_INPUT_SELECTOR = (
+    "input[autocomplete='one-time-code'], input[inputmode='numeric'], input[type='tel'], input[name*='code' i]"
+)
+
+# DOM side of popup dismissal in one round-trip: click the first visible close button. Escape is
+# sent separately via page.keyboard, since a synthetic KeyboardEvent is untrusted and ignored by
+# many modal libraries.
+_DISMISS_POPUPS_JS = """() => {
+    const visible = el => !!(el && el.getClientRects().length);
+    const selectors = [
+        "button[aria-label='Close']",
+        "button[aria-label='close']",
+        "[role='dialog'] button[aria-label='Close']",
+    ];
+    for (const sel of selectors) {
+        const el = document.querySelector(sel);
+        if (visible(el)) { el.click(); return true; }
+    }
+    const buttons = [...document.querySelectorAll('button')];
+    const name = b => (b.getAttribute('aria-label') || b.textContent || '').trim();
+    // Dialog "Close" buttons, then popups using an 'X' / '×' label.
+    let btn = buttons.find(b => b.closest("[role='dialog']") && /close/i.test(b.textContent || '') && visible(b));
+    if (!btn) btn = buttons.find(b => /^(x|×|close)$/i.test(name(b)) && visible(b));
+    if (btn) { btn.click(); return true; }
+    return false;
+}"""
+
+# One round-trip per session-key poll tick: dismiss a blocking popup, read the session key and
+# report whether an OTP form / verification text is on the page.
+_SESSION_POLL_JS = """({otpSelector, checkVerification}) => {
+    try { (""" + _DISMISS_POPUPS_JS + """)(); } catch (e) {}
+    let verification = false;
+    if (checkVerification) {
+        const html = (document.documentElement ? document.documentElement.outerHTML : '').toLowerCase();
+        verification = html.includes('verification') && html.includes('code');
+    }
+    return {
+        sk: window.localStorage.getItem('grvt_ss_on_chain'),
+        hasOtp: !!document.querySelector(otpSelector),
+        verification,
+    };
+}"""
+
+# QRCodeDetector construction is not free and the decode cascade calls it many times per image.
+# Keep one per thread (capture/decode can run on GUI worker threads).
+_QR_LOCAL = threading.local()
+
+# cv2/numpy (and pyzbar) are imported inside the decode helpers: they cost noticeable startup
+# time and the URL-based login path (`qr_login_from_url`) never decodes images.
+
+
+@functools.lru_cache(maxsize=1)
+def _zbar_decoder():
+    """pyzbar's decode, or None. ZBar needs a native library, so any import failure
+    (ImportError, or OSError when the DLL/.so is missing) just disables it."""
+    try:
+        from pyzbar.pyzbar import decode
+    except Exception:
+        return None
+    return decode
+
+
+def _qr_detector():
+    import cv2
+
+    detector = getattr(_QR_LOCAL, "detector", None)
+    if detector is None:
+        detector = _QR_LOCAL.detector = cv2.QRCodeDetector()
+    return detector
+
+
+def _qr_aruco_detector():
+    """Aruco-based QR detector (OpenCV >= 4.8), more tolerant of blur/low contrast. None if unavailable."""
+    if not hasattr(_QR_LOCAL, "aruco"):
+        import cv2
+
+        factory = getattr(cv2, "QRCodeDetectorAruco", None)
+        try:
+            _QR_LOCAL.aruco = factory() if factory is not None else None
+        except Exception:
+            _QR_LOCAL.aruco = None
+    return _QR_LOCAL.aruco
+
+
+def _qr_wechat_detector():
+    """WeChat CNN-based QR detector (opencv-contrib only). None if unavailable."""
+    if not hasattr(_QR_LOCAL, "wechat"):
+        import cv2
+
+        module = getattr(cv2, "wechat_qrcode", None)
+        factory = getattr(module, "WeChatQRCode", None) if module is not None else None
+        try:
+            _QR_LOCAL.wechat = factory() if factory is not None else None
+        except Exception:
+            _QR_LOCAL.wechat = None
+    return _QR_LOCAL.wechat
+
+
 def decode_qr_image(image_path: str | Path) -> str | None:
     """Decode QR code from image file. Returns URL or None."""
+    import cv2
+
     img = cv2.imread(str(image_path))
     if img is None:
         return None
-    detector = cv2.QRCodeDetector()
-    data, _, _ = detector.detectAndDecode(img)
+    data, _, _ = _qr_detector().detectAndDecode(img)
     if data:
         return data
 
     # OpenCV can fail on some QR versions/densities; fall back to PIL-based decoding.
+    # Reuse the already-decoded pixels instead of reading/decoding the file a second time.
     try:
         from PIL import Image
-        pil_img = Image.open(str(image_path))
+        pil_img = Image.fromarray(cv2.cvtColor(img, cv2.COLOR_BGR2RGB))
         return decode_qr_from_pil(pil_img)
     except Exception:
         return None
@@ -58,27 +183,86 @@ def decode_qr_image(image_path: str | Path) -> str | None:
 
 def decode_qr_from_pil(pil_image) -> str | None:
     """Decode QR code from PIL Image. Returns URL or None."""
-    img_array = np.array(pil_image.convert("RGB"))
-    img_bgr = cv2.cvtColor(img_array, cv2.COLOR_RGB2BGR)
+    import cv2
+    import numpy as np
+
+    # Primary attempt: pyzbar (no preprocessing cascade needed in the common case).
+    zbar_decode = _zbar_decoder()
+    if zbar_decode is not None:
+        try:
+            results = zbar_decode(pil_image)
+            if results:
+                return results[0].data.decode()
+        except Exception:
+            pass
+
+    # Fallback: OpenCV detectors + preprocessing cascade. Every path only needs grayscale
+    # (QRCodeDetector accepts single-channel input), so convert once and skip RGB/BGR buffers.
+    gray = np.array(pil_image.convert("L"))
 
     def _try_cv2(mat) -> str | None:
         try:
-            detector = cv2.QRCodeDetector()
-            data, _, _ = detector.detectAndDecode(mat)
+            data, _, _ = _qr_detector().detectAndDecode(mat)
             return data if data else None
         except Exception:
             return None
 
     # First attempt: raw image.
-    data = _try_cv2(img_bgr)
+    data = _try_cv2(gray)
     if data:
         return data
 
-    # Robust attempts: try multiple scales and binarization strategies.
-    gray = cv2.cvtColor(img_bgr, cv2.COLOR_BGR2GRAY)
-    for scale in (1.25, 1.5, 2.0, 3.0, 4.0):
+    # Second attempt: the Aruco-based detector usually handles degraded captures in one call,
+    # sparing the scale/threshold sweep below.
+    aruco = _qr_aruco_detector()
+    if aruco is not None:
         try:
-            resized = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_NEAREST)
+            data, _, _ = aruco.detectAndDecode(gray)
+            if data:
+                return data
+        except Exception:
+            pass
+
+    # Scratch buffer for inverted thresholds; reused while the scale (and so the shape) is unchanged.
+    inv_buf = None
+
+    def _try_binary(th) -> str | None:
+        nonlocal inv_buf
+        data = _try_cv2(th)
+        if data:
+            return data
+        if inv_buf is None or inv_buf.shape != th.shape:
+            inv_buf = np.empty_like(th)
+        cv2.bitwise_not(th, dst=inv_buf)
+        return _try_cv2(inv_buf)
+
+    # Third attempt: WeChatQRCode (C++ pipeline for noisy/low-res codes), when opencv-contrib is installed.
+    wechat = _qr_wechat_detector()
+    if wechat is not None:
+        try:
+            res, _ = wechat.detectAndDecode(gray)
+            if res and res[0]:
+                return res[0]
+        except Exception:
+            pass
+
+    try:
+        lap_var = float(cv2.Laplacian(gray, cv2.CV_64F).var())
+        dark_ratio = cv2.countNonZero(cv2.inRange(gray, 0, 40)) / max(1, gray.size)
+        if lap_var < _QR_MIN_LAPLACIAN_VAR and dark_ratio < _QR_MIN_DARK_RATIO:
+            return None
+    except Exception:
+        pass
+
+    # Robust attempts: try multiple scales and binarization strategies. Skip upscales that would
+    # exceed ~3000px (large captures gain nothing, at up to 16x the pixels). Fractional scales use
+    # bilinear to keep module edges; integer scales replicate pixels to keep modules sharp.
+    h = gray.shape[0]
+    scales = tuple(s for s in (1.25, 1.5, 2.0, 3.0, 4.0) if s * h <= _QR_MAX_UPSCALED_PX) or (1.0,)
+    for scale in scales:
+        interp = cv2.INTER_NEAREST if float(scale).is_integer() else cv2.INTER_LINEAR
+        try:
+            resized = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=interp)
         except Exception:
             resized = gray
 
@@ -86,10 +270,7 @@ def decode_qr_from_pil(pil_image) -> str | None:
             # Otsu threshold
             try:
                 _, th = cv2.threshold(mat, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
-                data = _try_cv2(th)
-                if data:
-                    return data
-                data = _try_cv2(255 - th)
+                data = _try_binary(th)
                 if data:
                     return data
             except Exception:
@@ -98,23 +279,12 @@ def decode_qr_from_pil(pil_image) -> str | None:
             # Adaptive threshold
             try:
                 th = cv2.adaptiveThreshold(mat, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 31, 2)
-                data = _try_cv2(th)
-                if data:
-                    return data
-                data = _try_cv2(255 - th)
+                data = _try_binary(th)
                 if data:
                     return data
             except Exception:
                 pass
 
-    # Fallback to pyzbar if cv2 fails
-    try:
-        from pyzbar.pyzbar import decode
-        results = decode(pil_image)
-        if results:
-            return results[0].data.decode()
-    except ImportError:
-        pass
     return None
 
 
@@ -124,29 +294,8 @@ def _dismiss_popups(page) -> None:
         page.keyboard.press("Escape")
     except Exception:
         pass
-
-    # Try a few common close button patterns.
-    candidates = [
-        "button[aria-label='Close']",
-        "button[aria-label='close']",
-        "[role='dialog'] button[aria-label='Close']",
-        "[role='dialog'] button:has-text('Close')",
-    ]
-    for sel in candidates:
-        try:
-            loc = page.locator(sel).first
-            if loc.count() > 0:
-                loc.click(timeout=800)
-                return
-        except Exception:
-            pass
-
-    # Some popups use an 'X' or '×' label.
     try:
-        btn = page.get_by_role("button", name=re.compile(r"^(x|×|close)$", re.I)).first
-        if btn.count() > 0:
-            btn.click(timeout=800)
-            return
+        page.evaluate(_DISMISS_POPUPS_JS)
     except Exception:
         pass
 
@@ -159,22 +308,9 @@ def _is_cloudflare_blocked(page) -> bool:
             return True
     except Exception:
         pass
+    # Match title/HTML inside the page so only a boolean crosses CDP (not the serialized DOM).
     try:
-        title = (page.title() or "").lower()
-        if "just a moment" in title or "attention required" in title:
-            return True
-    except Exception:
-        pass
-    try:
-        body = (page.content() or "").lower()
-        needles = [
-            "you have been blocked",
-            "attention required",
-            "checking your browser",
-            "cf-challenge",
-            "/cdn-cgi/",
-        ]
-        return any(n in body for n in needles)
+        return bool(page.evaluate(_CF_BLOCK_JS, list(_CF_BODY_NEEDLES)))
     except Exception:
         return False
 
@@ -192,29 +328,31 @@ def _wait_for_session_key(
     verification_seen = False
     prompted = False
     while time.time() < deadline:
-        _dismiss_popups(page)
         try:
-            sk = page.evaluate("() => window.localStorage.getItem('grvt_ss_on_chain')")  # type: ignore[arg-type]
+            page.keyboard.press("Escape")
+        except Exception:
+            pass
+        try:
+            tick = page.evaluate(
+                _SESSION_POLL_JS, {"otpSelector": _OTP_INPUT_SELECTOR, "checkVerification": not verification_seen}
+            ) or {}
         except Exception:
-            sk = None
+            tick = {}
+        sk = tick.get("sk")
         if sk:
             return str(sk), verification_seen
 
-        if not verification_seen:
-            # Heuristic: some verification UIs don't expose obvious OTP inputs immediately.
-            try:
-                body = (page.content() or "").lower()
-                if "verification" in body and "code" in body:
-                    verification_seen = True
-            except Exception:
-                pass
+        # Heuristic: some verification UIs don't expose obvious OTP inputs immediately.
+        if tick.get("verification"):
+            verification_seen = True
 
-        if not prompted:
+        if not prompted and tick.get("hasOtp"):
             did = _try_submit_email_code(page, get_email_code=get_email_code, on_event=on_event)
             if did:
                 verification_seen = True
                 prompted = True
-        time.sleep(0.5)
+        # Returns as soon as the key lands instead of sleeping out the full tick.
+        _wait_for_ls_key(page, "grvt_ss_on_chain", timeout_sec=0.5)
 
     return None, verification_seen
 
@@ -228,12 +366,10 @@ def _manual_verification_headed(
     """Open a headed browser with the current state to allow manual verification."""
     def _run() -> str | None:
         from playwright.sync_api import sync_playwright
-        from playwright_stealth import Stealth
 
         ensure_playwright_browsers_path()
         with sync_playwright() as p:
-            stealth = Stealth()
-            stealth.hook_playwright_context(p)
+            get_stealth().hook_playwright_context(p)
             browser = _launch_chromium(
                 p,
                 headless=False,
@@ -249,25 +385,36 @@ def _manual_verification_headed(
                 page.goto(origin, wait_until="domcontentloaded", timeout=60000)
 
             sk, _ = _wait_for_session_key(page, timeout_sec=timeout_sec, get_email_code=None, on_event=None)
-            context.storage_state(path=str(state_path))
+            write_storage_state(state_path, context.storage_state())
             browser.close()
             return sk
 
     return run_sync_playwright(_run)
 
 
+def _wait_for_ls_key(page, key: str, *, timeout_sec: float) -> bool:
+    """Block (in-browser) until localStorage[key] is set or the timeout passes."""
+    try:
+        page.wait_for_function(
+            "(k) => !!window.localStorage.getItem(k)", arg=key, timeout=timeout_sec * 1000, polling=100
+        )
+        return True
+    except Exception:
+        return False
+
+
 def _wait_for_local_storage_key(page, key: str, *, timeout_sec: float) -> str | None:
-    """Poll localStorage for a key to appear, while dismissing popups."""
+    """Wait for a localStorage key to appear, dismissing popups every few seconds."""
     deadline = time.time() + timeout_sec
     while time.time() < deadline:
         _dismiss_popups(page)
-        try:
-            val = page.evaluate("(k) => window.localStorage.getItem(k)", key)
-            if val:
-                return str(val)
-        except Exception:
-            pass
-        time.sleep(0.5)
+        if _wait_for_ls_key(page, key, timeout_sec=max(0.1, min(5.0, deadline - time.time()))):
+            try:
+                val = page.evaluate("(k) => window.localStorage.getItem(k)", key)
+                if val:
+                    return str(val)
+            except Exception:
+                pass
     return None
 
 
@@ -290,9 +437,7 @@ def _try_submit_email_code(
     Returns True if a code was entered/submitted (not a guarantee of success).
     """
     # Heuristic: OTP forms usually have numeric inputs, or an "one-time-code" field.
-    otp_inputs = page.locator(
-        "input[autocomplete='one-time-code'], input[inputmode='numeric'], input[type='tel'], input[name*='code' i]"
-    )
+    otp_inputs = page.locator(_OTP_INPUT_SELECTOR)
     try:
         count = otp_inputs.count()
     except Exception:
@@ -308,9 +453,9 @@ def _try_submit_email_code(
         pass
 
     # Some flows require clicking "Send code"/"Resend" before inputs become usable.
-    for label in ("Send code", "Resend", "Get code", "Send", "Request code"):
+    for pattern in _SEND_CODE_RES:
         try:
-            btn = page.get_by_role("button", name=re.compile(label, re.I)).first
+            btn = page.get_by_role("button", name=pattern).first
             if btn.count() > 0 and btn.is_enabled():
                 btn.click(timeout=1000)
                 break
@@ -338,9 +483,15 @@ def _try_submit_email_code(
             if len(digits) < count:
                 # Still try: fill what we have.
                 _notify(on_event, f"Code length ({len(digits)}) shorter than expected ({count}). Trying anyway...")
-            for i in range(min(count, len(digits))):
-                otp_inputs.nth(i).click(timeout=800)
-                otp_inputs.nth(i).fill(digits[i], timeout=1200)
+            if os.getenv("GRVT_SLOW_OTP"):
+                # Per-digit fill for UIs that don't auto-advance focus (2 round-trips per digit).
+                for i in range(min(count, len(digits))):
+                    otp_inputs.nth(i).click(timeout=800)
+                    otp_inputs.nth(i).fill(digits[i], timeout=1200)
+            else:
+                # Split-digit inputs auto-advance focus; type the whole code in one call.
+                otp_inputs.first.click(timeout=800)
+                page.keyboard.type("".join(digits[:count]), delay=0)
     except Exception:
         # Some UIs block fill(); fallback to type.
         try:
@@ -350,9 +501,9 @@ def _try_submit_email_code(
             return False
 
     # Try common submit buttons.
-    for label in ("Verify", "Continue", "Confirm", "Submit", "Next"):
+    for pattern in _SUBMIT_CODE_RES:
         try:
-            btn = page.get_by_role("button", name=re.compile(label, re.I)).first
+            btn = page.get_by_role("button", name=pattern).first
             if btn.count() > 0 and btn.is_enabled():
                 btn.click(timeout=1500)
                 _notify(on_event, "Submitted email verification code.")
@@ -369,6 +520,45 @@ def _try_submit_email_code(
         return True
 
 
+# Runs inside the logged-in page: query the edge GraphQL endpoint and persist the IDs we need
+# into localStorage (Cloudflare blocks direct Python TLS calls).
+_POPULATE_ACCOUNT_JS = """async ({query, edgeUrl}) => {
+    const subRaw = window.localStorage.getItem('grvt:sub_account_id');
+    let selected = null;
+    if (subRaw) {
+      try { selected = JSON.parse(subRaw); } catch(e) { selected = subRaw; }
+    }
+    const cidRaw = window.localStorage.getItem('grvt:client_id');
+    let cid = null;
+    if (cidRaw) {
+      try { cid = JSON.parse(cidRaw); } catch(e) { cid = cidRaw; }
+    }
+    const headers = { 'content-type': 'application/json', 'x-api-source': 'WEB' };
+    if (cid) headers['x-client-session-id'] = String(cid);
+    try { headers['x-trace-id'] = crypto.randomUUID(); } catch(e) {}
+    headers['x-device-fingerprint'] = `UserAgent=${navigator.userAgent}`;
+
+    const resp = await fetch(edgeUrl + '/query', {
+      method: 'POST',
+      headers,
+      credentials: 'include',
+      body: JSON.stringify({ query })
+    });
+    const text = await resp.text();
+    let data = null;
+    try { data = JSON.parse(text); } catch(e) {}
+    const subs = data?.data?.userSubAccounts?.data?.subAccounts || [];
+    let match = null;
+    if (selected) match = subs.find(x => x?.subAccount?.id === selected) || null;
+    if (!match && subs.length) match = subs[0];
+    if (!match) return;
+    const chainSub = match.subAccount.chainSubAccountID;
+    const accountID = (match.subAccount.accountID || '').replace('ACC:', '');
+    if (chainSub) window.localStorage.setItem('grvt:chain_sub_account_id', String(chainSub));
+    if (accountID) window.localStorage.setItem('grvt:account_id', accountID);
+}"""
+
+
 def _populate_account_ids(page) -> None:
     """Populate localStorage with IDs needed for authenticated trading.
 
@@ -379,59 +569,10 @@ def _populate_account_ids(page) -> None:
     Cloudflare blocks direct Python TLS calls to `edge.grvt.io`, so we query it from inside the
     browser context and persist into localStorage for later reuse.
     """
-    # NOTE: Must contain real newlines (not literal "\\n" sequences).
-    query = """query UserSubAccountsQuery {
-  userSubAccounts {
-    data {
-      subAccounts {
-        subAccount {
-          id
-          chainSubAccountID
-          accountID
-        }
-      }
-    }
-  }
-}
-"""
     try:
         page.evaluate(
-            """async ({query, edgeUrl}) => {
-                const subRaw = window.localStorage.getItem('grvt:sub_account_id');
-                let selected = null;
-                if (subRaw) {
-                  try { selected = JSON.parse(subRaw); } catch(e) { selected = subRaw; }
-                }
-                const cidRaw = window.localStorage.getItem('grvt:client_id');
-                let cid = null;
-                if (cidRaw) {
-                  try { cid = JSON.parse(cidRaw); } catch(e) { cid = cidRaw; }
-                }
-                const headers = { 'content-type': 'application/json', 'x-api-source': 'WEB' };
-                if (cid) headers['x-client-session-id'] = String(cid);
-                try { headers['x-trace-id'] = crypto.randomUUID(); } catch(e) {}
-                headers['x-device-fingerprint'] = `UserAgent=${navigator.userAgent}`;
-
-                const resp = await fetch(edgeUrl + '/query', {
-                  method: 'POST',
-                  headers,
-                  credentials: 'include',
-                  body: JSON.stringify({ query })
-                });
-                const text = await resp.text();
-                let data = null;
-                try { data = JSON.parse(text); } catch(e) {}
-                const subs = data?.data?.userSubAccounts?.data?.subAccounts || [];
-                let match = null;
-                if (selected) match = subs.find(x => x?.subAccount?.id === selected) || null;
-                if (!match && subs.length) match = subs[0];
-                if (!match) return;
-                const chainSub = match.subAccount.chainSubAccountID;
-                const accountID = (match.subAccount.accountID || '').replace('ACC:', '');
-                if (chainSub) window.localStorage.setItem('grvt:chain_sub_account_id', String(chainSub));
-                if (accountID) window.localStorage.setItem('grvt:account_id', accountID);
-            }""",
-            {"query": query, "edgeUrl": EDGE_URL},
+            _POPULATE_ACCOUNT_JS,
+            {"query": USER_SUBACCOUNTS_QUERY, "edgeUrl": EDGE_URL},
         )
     except Exception:
         # Best-effort. If this fails, we fall back to deriving IDs later (or prompt re-login).
@@ -440,6 +581,13 @@ def _populate_account_ids(page) -> None:
 
 def parse_qr_url(url: str) -> dict | None:
     """Parse and validate QR login URL. Returns payload dict or None."""
+    payload = _parse_qr_url_cached(url)
+    # Hand out a copy so callers can't mutate the memoized payload.
+    return dict(payload) if payload is not None else None
+
+
+@functools.lru_cache(maxsize=16)
+def _parse_qr_url_cached(url: str) -> dict | None:
     parsed = urlparse(url)
     if parsed.path != "/qr-login":
         return None
@@ -478,7 +626,6 @@ def qr_login_from_url(
     """
     def _run() -> tuple[str | None, str]:
         from playwright.sync_api import sync_playwright
-        from playwright_stealth import Stealth
 
         payload = parse_qr_url(url)
         if not payload:
@@ -489,8 +636,7 @@ def qr_login_from_url(
         try:
             ensure_playwright_browsers_path()
             with sync_playwright() as p:
-                stealth = Stealth()
-                stealth.hook_playwright_context(p)
+                get_stealth().hook_playwright_context(p)
                 args = ["--disable-blink-features=AutomationControlled"]
                 if headless:
                     args = ["--headless=new", *args]
@@ -531,14 +677,7 @@ def qr_login_from_url(
                     return None, "Cloudflare blocked this browser session. Capture a fresh QR and try again."
 
                 # Wait for gravity cookie
-                start = time.time()
-                gravity = None
-                while time.time() - start < timeout_sec:
-                    cookies = context.cookies()
-                    gravity = next((c["value"] for c in cookies if c.get("name") == "gravity"), None)
-                    if gravity:
-                        break
-                    time.sleep(1)
+                gravity = wait_for_gravity_cookie(context, page, origin=origin, timeout_sec=timeout_sec)
 
                 if not gravity:
                     browser.close()
@@ -553,7 +692,7 @@ def qr_login_from_url(
                         # using the *current* session state (no need for a fresh QR).
                         if headless and verification_seen and _allow_headed_fallback:
                             _notify(on_event, "Email verification needs manual completion; opening headed browser...")
-                            context.storage_state(path=str(state_path))
+                            write_storage_state(state_path, context.storage_state())
                             browser.close()
                             remaining = max(30.0, float(session_key_timeout_sec))
                             sk2 = _manual_verification_headed(state_path=state_path, origin=origin, timeout_sec=remaining)
@@ -567,7 +706,7 @@ def qr_login_from_url(
                 # Populate account/subaccount IDs for API usage.
                 _populate_account_ids(page)
 
-                context.storage_state(path=str(state_path))
+                write_storage_state(state_path, context.storage_state())
                 browser.close()
 
             save_cookie_cache(gravity)
@@ -632,17 +771,10 @@ def qr_login(
                 pass  # May not redirect to trade page
 
             # Wait for gravity cookie
-            start = time.time()
-            gravity = None
-            while time.time() - start < timeout_sec:
-                try:
-                    cookies = context.cookies()
-                    gravity = next((c["value"] for c in cookies if c.get("name") == "gravity"), None)
-                    if gravity:
-                        break
-                    time.sleep(0.5)
-                except Exception:
-                    break
+            try:
+                gravity = wait_for_gravity_cookie(context, page, origin=origin, timeout_sec=timeout_sec)
+            except Exception:
+                gravity = None
 
             if not gravity:
                 browser.close()
@@ -668,7 +800,7 @@ def qr_login(
                         )
                         if did:
                             prompted = True
-                    time.sleep(0.5)
+                    _wait_for_ls_key(page, "grvt_ss_on_chain", timeout_sec=0.5)
 
                 if not sk:
                     browser.close()
@@ -678,7 +810,7 @@ def qr_login(
             _populate_account_ids(page)
 
             # Save state
-            context.storage_state(path=str(state_path))
+            write_storage_state(state_path, context.storage_state())
 
             # Validate session key in localStorage
             try:
@@ -1,30 +1,253 @@
 from __future__ import annotations
 
-import json
+import contextlib
+import functools
+import threading
+import time
 from pathlib import Path
 
-from grvt_volume_boost.playwright_compat import run_sync_playwright
+from grvt_volume_boost import json_compat
+from grvt_volume_boost.playwright_compat import get_stealth, run_sync_playwright
+from grvt_volume_boost.util import atomic_write_bytes, env_flag
+
+# One browser session per state file at a time: login flows call ensure_account_ids (via
+# reload_accounts) and fetch_subaccounts back-to-back on different threads, and both persist
+# storage-state on exit.
+_EDGE_LOCKS: dict[str, threading.Lock] = {}
+_EDGE_LOCKS_GUARD = threading.Lock()
+
+# Subaccount lists per (resolved state path, session user id): (fetched_at, subs). Lets the second
+# caller of the post-login pair reuse the first one's result instead of starting another browser.
+# The user id keeps a different account logged into the same slot from reading the previous
+# account's subaccounts.
+_SUBACCOUNTS_TTL_SEC = 60.0
+_SUBACCOUNTS_CACHE: dict[tuple[str, str], tuple[float, list[dict]]] = {}
+
+# Shared with qr_login's in-page ID population.
+# NOTE: The query string must contain real newlines. If it contains literal "\n"
+# sequences (backslash + n), the GraphQL parser will reject it.
+USER_SUBACCOUNTS_QUERY = """query UserSubAccountsQuery {
+  userSubAccounts {
+    data {
+      subAccounts {
+        subAccount {
+          id
+          name
+          chainSubAccountID
+          accountID
+        }
+      }
+    }
+  }
+}
+"""
+_USER_SUBACCOUNTS_BODY = json_compat.dumps({"query": USER_SUBACCOUNTS_QUERY})
+
+# cf_clearance is bound to the UA that solved the challenge; QR login and cookie refresh both
+# run in this mobile context.
+_EDGE_HTTP_USER_AGENT = (
+    "Mozilla/5.0 (Linux; Android 14; Pixel 8 Pro) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Mobile Safari/537.36"
+)
+
+_EDGE_QUERY_JS = """async ({body, edgeUrl}) => {
+    const cidRaw = window.localStorage.getItem('grvt:client_id');
+    let cid = null;
+    if (cidRaw) {
+      try { cid = JSON.parse(cidRaw); } catch(e) { cid = cidRaw; }
+    }
+    const headers = { 'content-type': 'application/json', 'x-api-source': 'WEB' };
+    if (cid) headers['x-client-session-id'] = String(cid);
+    try { headers['x-trace-id'] = crypto.randomUUID(); } catch(e) {}
+    headers['x-device-fingerprint'] = `UserAgent=${navigator.userAgent}`;
+    const resp = await fetch(edgeUrl + '/query', {
+      method: 'POST',
+      headers,
+      credentials: 'include',
+      body
+    });
+    if (resp.ok) {
+      try { return await resp.clone().json(); } catch(e) {}
+    }
+    const text = await resp.text();
+    return { errors:[{message: resp.ok ? 'non-json' : 'http-error'}], _text: text.slice(0,200), _status: resp.status };
+}"""
+
+
+def _edge_lock(state_path: Path) -> threading.Lock:
+    key = str(state_path.resolve())
+    with _EDGE_LOCKS_GUARD:
+        lock = _EDGE_LOCKS.get(key)
+        if lock is None:
+            lock = _EDGE_LOCKS[key] = threading.Lock()
+        return lock
+
+
+@contextlib.contextmanager
+def _edge_page(state_path: Path, origin: str):
+    """Yield a page on `origin` loaded with `state_path`; persist storage-state and close on exit.
+
+    Must run inside `run_sync_playwright` (the sync API is bound to the calling thread).
+    """
+    from playwright.sync_api import sync_playwright
+    from grvt_volume_boost.runtime import ensure_playwright_browsers_path
+
+    ensure_playwright_browsers_path()
+    with sync_playwright() as p:
+        get_stealth().hook_playwright_context(p)
+        browser = p.chromium.launch(
+            headless=True,
+            args=["--headless=new", "--disable-blink-features=AutomationControlled"],
+            channel="chrome",
+        )
+        try:
+            context = browser.new_context(storage_state=str(state_path), viewport={"width": 1280, "height": 720}, locale="en-US")
+            page = context.new_page()
+            page.goto(origin, wait_until="domcontentloaded", timeout=60000)
+            yield page
+            write_storage_state(state_path, context.storage_state())
+        finally:
+            browser.close()
+
+
+def _query_subaccounts(page, edge_url: str) -> list[dict]:
+    """Run `UserSubAccountsQuery` from `page` and return normalized subaccount dicts."""
+    data = page.evaluate(_EDGE_QUERY_JS, {"body": _USER_SUBACCOUNTS_BODY.decode(), "edgeUrl": edge_url})
+    return _normalize_subaccounts(data)
+
+
+def _normalize_subaccounts(data) -> list[dict]:
+    try:
+        entries = data["data"]["userSubAccounts"]["data"]["subAccounts"] or []
+    except (TypeError, KeyError):
+        return []
+    out = []
+    for entry in entries:
+        sa = entry.get("subAccount") if isinstance(entry, dict) else None
+        if not sa:
+            continue
+        out.append(
+            {
+                "id": sa.get("id"),
+                "name": sa.get("name"),
+                "chainSubAccountID": str(sa.get("chainSubAccountID")) if sa.get("chainSubAccountID") is not None else None,
+                "accountID": sa.get("accountID"),
+            }
+        )
+    return out
+
+
+@functools.lru_cache(maxsize=1)
+def _edge_http_session():
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    session = requests.Session()
+    session.mount("https://", HTTPAdapter(pool_connections=2, pool_maxsize=4))
+    return session
+
+
+def _query_subaccounts_http(state_path: Path, origin: str, edge_url: str) -> list[dict]:
+    """Try `UserSubAccountsQuery` over plain HTTPS with the saved cookies.
+
+    Returns [] when Cloudflare (or anything else) rejects the request; callers fall back to the browser.
+    """
+    from urllib.parse import urlsplit
+
+    try:
+        state = json_compat.loads(state_path.read_bytes())
+    except (OSError, json_compat.JSONDecodeError):
+        return []
+    host = urlsplit(edge_url).hostname or ""
+    cookies = []
+    for c in state.get("cookies", []) or []:
+        domain = str(c.get("domain") or "").lstrip(".")
+        if domain and (host == domain or host.endswith("." + domain)):
+            cookies.append(f"{c.get('name')}={c.get('value')}")
+    if not cookies:
+        return []
+
+    headers = {
+        "content-type": "application/json",
+        "x-api-source": "WEB",
+        "origin": origin,
+        "referer": f"{origin}/",
+        "user-agent": _EDGE_HTTP_USER_AGENT,
+        "x-device-fingerprint": f"UserAgent={_EDGE_HTTP_USER_AGENT}",
+        "cookie": "; ".join(cookies),
+    }
+    client_id = _get_local_storage(state, origin).get("grvt:client_id")
+    if client_id:
+        headers["x-client-session-id"] = _parse_jsonish_value(client_id)
+
+    try:
+        r = _edge_http_session().post(
+            f"{edge_url}/query", data=_USER_SUBACCOUNTS_BODY, headers=headers, timeout=10
+        )
+        if r.status_code != 200:
+            return []
+        return _normalize_subaccounts(json_compat.loads(r.content))
+    except Exception:
+        return []
+
+
+def _subaccounts(state_path: Path, origin: str) -> list[dict]:
+    """Subaccounts for `state_path`, fetched at most once per TTL (shared; treat as read-only)."""
+    from grvt_volume_boost.settings import EDGE_URL
+
+    with _edge_lock(state_path):
+        try:
+            user_id = extract_account_from_browser_state(state_path, origin=origin)[0]
+        except Exception:
+            user_id = None
+        # Without a session identity the file can't be told apart from another login; don't cache.
+        key = (str(state_path.resolve()), user_id) if user_id else None
+        hit = _SUBACCOUNTS_CACHE.get(key) if key else None
+        if hit is not None and time.monotonic() - hit[0] < _SUBACCOUNTS_TTL_SEC:
+            return hit[1]
+
+        def _run() -> list[dict]:
+            with _edge_page(state_path, origin) as page:
+                return _query_subaccounts(page, EDGE_URL)
+
+        # Cloudflare usually blocks direct Python requests, but a still-valid cf_clearance in the
+        # saved cookies can let it through; only start a browser when that fails.
+        subs = _query_subaccounts_http(state_path, origin, EDGE_URL) or run_sync_playwright(_run)
+        if subs and key:
+            _SUBACCOUNTS_CACHE[key] = (time.monotonic(), subs)
+        return subs
 
 
 def _parse_jsonish_value(raw: str) -> str:
     """Parse values stored via JSON.stringify, falling back to the raw string."""
     s = str(raw)
     try:
-        v = json.loads(s)
+        v = json_compat.loads(s)
         return str(v)
     except Exception:
         return s
 
 
-def extract_selected_sub_account_id(state_path: Path, *, origin: str) -> str | None:
-    """Extract the selected sub-account ID (e.g. 'SUB:...') from localStorage."""
-    if not state_path.exists():
+def _load_local_storage(state_path: Path, origin: str) -> dict:
+    """localStorage for `origin`, parsed once per state-file version (shared; treat as read-only)."""
+    st = state_path.stat()
+    return _local_storage_cached(str(state_path), st.st_mtime_ns, st.st_size, origin)
+
+
+def _try_load_local_storage(state_path: Path, origin: str) -> dict | None:
+    """Like `_load_local_storage`, but None when the state file does not exist."""
+    try:
+        return _load_local_storage(state_path, origin)
+    except FileNotFoundError:
         return None
 
-    with open(state_path, "r", encoding="utf-8") as f:
-        state = json.load(f)
 
-    local_storage = _get_local_storage(state, origin)
+@functools.lru_cache(maxsize=8)
+def _local_storage_cached(path: str, mtime_ns: int, size: int, origin: str) -> dict:
+    state = json_compat.loads(Path(path).read_bytes())
+    return _get_local_storage(state, origin)
+
+
+def _selected_sub_account_id(local_storage: dict) -> str | None:
     raw = local_storage.get("grvt:sub_account_id", "")
     if not raw:
         return None
@@ -34,19 +257,7 @@ def extract_selected_sub_account_id(state_path: Path, *, origin: str) -> str | N
         return None
 
 
-def extract_chain_sub_account_id(state_path: Path, *, origin: str) -> str | None:
-    """Extract the numeric chain sub-account ID (uint64) from localStorage.
-
-    We store this in localStorage as `grvt:chain_sub_account_id` after QR login by querying
-    the GRVT edge GraphQL endpoint from within a real browser context (Cloudflare blocks Python TLS).
-    """
-    if not state_path.exists():
-        return None
-
-    with open(state_path, "r", encoding="utf-8") as f:
-        state = json.load(f)
-
-    local_storage = _get_local_storage(state, origin)
+def _chain_sub_account_id(local_storage: dict) -> str | None:
     raw = local_storage.get("grvt:chain_sub_account_id", "")
     if not raw:
         return None
@@ -54,15 +265,7 @@ def extract_chain_sub_account_id(state_path: Path, *, origin: str) -> str | None
     return val if val.isdigit() else None
 
 
-def extract_account_id(state_path: Path, *, origin: str) -> str | None:
-    """Extract the main account ID used for `X-Grvt-Account-Id` from localStorage."""
-    if not state_path.exists():
-        return None
-
-    with open(state_path, "r", encoding="utf-8") as f:
-        state = json.load(f)
-
-    local_storage = _get_local_storage(state, origin)
+def _account_id(local_storage: dict) -> str | None:
     raw = local_storage.get("grvt:account_id", "")
     if not raw:
         return None
@@ -70,6 +273,28 @@ def extract_account_id(state_path: Path, *, origin: str) -> str | None:
     return val or None
 
 
+def extract_selected_sub_account_id(state_path: Path, *, origin: str) -> str | None:
+    """Extract the selected sub-account ID (e.g. 'SUB:...') from localStorage."""
+    local_storage = _try_load_local_storage(state_path, origin)
+    return _selected_sub_account_id(local_storage) if local_storage is not None else None
+
+
+def extract_chain_sub_account_id(state_path: Path, *, origin: str) -> str | None:
+    """Extract the numeric chain sub-account ID (uint64) from localStorage.
+
+    We store this in localStorage as `grvt:chain_sub_account_id` after QR login by querying
+    the GRVT edge GraphQL endpoint from within a real browser context (Cloudflare blocks Python TLS).
+    """
+    local_storage = _try_load_local_storage(state_path, origin)
+    return _chain_sub_account_id(local_storage) if local_storage is not None else None
+
+
+def extract_account_id(state_path: Path, *, origin: str) -> str | None:
+    """Extract the main account ID used for `X-Grvt-Account-Id` from localStorage."""
+    local_storage = _try_load_local_storage(state_path, origin)
+    return _account_id(local_storage) if local_storage is not None else None
+
+
 def ensure_account_ids(state_path: Path, *, origin: str) -> tuple[str | None, str | None]:
     """Ensure `grvt:account_id` and `grvt:chain_sub_account_id` exist in storage-state.
 
@@ -77,106 +302,41 @@ def ensure_account_ids(state_path: Path, *, origin: str) -> tuple[str | None, st
     Otherwise, we launch a real browser with the provided storage-state, query the edge GraphQL
     endpoint, and persist the discovered IDs back into the state file via localStorage.
     """
-    acc_id = extract_account_id(state_path, origin=origin)
-    chain_sa = extract_chain_sub_account_id(state_path, origin=origin)
+    local_storage = _try_load_local_storage(state_path, origin)
+    if local_storage is None:
+        return None, None
+    acc_id = _account_id(local_storage)
+    chain_sa = _chain_sub_account_id(local_storage)
     if acc_id and chain_sa:
         return acc_id, chain_sa
 
-    selected_sub = extract_selected_sub_account_id(state_path, origin=origin)
+    selected_sub = _selected_sub_account_id(local_storage)
     if not selected_sub:
         return acc_id, chain_sa
 
-    # Cloudflare blocks direct Python requests; do the GraphQL query via a real browser context.
-    from grvt_volume_boost.settings import EDGE_URL
-
-    # NOTE: The query string must contain real newlines. If it contains literal "\n"
-    # sequences (backslash + n), the GraphQL parser will reject it.
-    query = """query UserSubAccountsQuery {
-  userSubAccounts {
-    data {
-      subAccounts {
-        subAccount {
-          id
-          chainSubAccountID
-          accountID
-        }
-      }
-    }
-  }
-}
-"""
-
-    def _run() -> dict | None:
-        from playwright.sync_api import sync_playwright
-        from playwright_stealth import Stealth
-        from grvt_volume_boost.runtime import ensure_playwright_browsers_path
-
-        ensure_playwright_browsers_path()
-        with sync_playwright() as p:
-            stealth = Stealth()
-            stealth.hook_playwright_context(p)
-            browser = p.chromium.launch(
-                headless=True,
-                args=["--headless=new", "--disable-blink-features=AutomationControlled"],
-                channel="chrome",
-            )
-            context = browser.new_context(storage_state=str(state_path), viewport={"width": 1280, "height": 720}, locale="en-US")
-            page = context.new_page()
-            page.goto(origin, wait_until="domcontentloaded", timeout=60000)
-
-            result = page.evaluate(
-                """async ({query, selectedSub, edgeUrl}) => {
-                    const subRaw = window.localStorage.getItem('grvt:sub_account_id');
-                    let selected = selectedSub;
-                    if (!selected && subRaw) {
-                      try { selected = JSON.parse(subRaw); } catch(e) { selected = subRaw; }
-                    }
-                    const cidRaw = window.localStorage.getItem('grvt:client_id');
-                    let cid = null;
-                    if (cidRaw) {
-                      try { cid = JSON.parse(cidRaw); } catch(e) { cid = cidRaw; }
-                    }
-                    const headers = { 'content-type': 'application/json', 'x-api-source': 'WEB' };
-                    if (cid) headers['x-client-session-id'] = String(cid);
-                    try { headers['x-trace-id'] = crypto.randomUUID(); } catch(e) {}
-                    headers['x-device-fingerprint'] = `UserAgent=${navigator.userAgent}`;
-                     const resp = await fetch(edgeUrl + '/query', {
-                       method: 'POST',
-                       headers,
-                       credentials: 'include',
-                       body: JSON.stringify({ query })
-                     });
-                    const text = await resp.text();
-                    let data = null;
-                    try { data = JSON.parse(text); } catch(e) {}
-                    const subs = data?.data?.userSubAccounts?.data?.subAccounts || [];
-                    let match = null;
-                    if (selected) match = subs.find(x => x?.subAccount?.id === selected) || null;
-                    if (!match && subs.length) match = subs[0];
-                    if (!match) return { ok:false, status: resp.status, selected, text: text.slice(0,200) };
-                    const chainSub = match.subAccount.chainSubAccountID;
-                    const accountID = (match.subAccount.accountID || '').replace('ACC:', '');
-                    if (chainSub) window.localStorage.setItem('grvt:chain_sub_account_id', String(chainSub));
-                    if (accountID) window.localStorage.setItem('grvt:account_id', accountID);
-                    return { ok:true, chainSubAccountID: String(chainSub), accountID };
-                }""",
-                {"query": query, "selectedSub": selected_sub, "edgeUrl": EDGE_URL},
-            )
-
-            context.storage_state(path=str(state_path))
-            browser.close()
-            return result if isinstance(result, dict) else None
-
     try:
-        result = run_sync_playwright(_run)
-        if isinstance(result, dict) and result.get("ok"):
-            acc_id = str(result.get("accountID") or "") or acc_id
-            chain_sa = str(result.get("chainSubAccountID") or "") or chain_sa
+        subs = _subaccounts(state_path, origin)
     except Exception:
         # Best-effort: if we can't derive IDs, callers will surface a clear re-login error.
-        pass
+        return acc_id, chain_sa
 
-    return acc_id, chain_sa
+    match = next((sa for sa in subs if sa.get("id") == selected_sub), None) or (subs[0] if subs else None)
+    if match is None:
+        return acc_id, chain_sa
+
+    new_chain = match.get("chainSubAccountID") or ""
+    new_acc = str(match.get("accountID") or "").replace("ACC:", "")
+    updates = {}
+    if new_chain:
+        updates["grvt:chain_sub_account_id"] = new_chain
+    if new_acc:
+        updates["grvt:account_id"] = new_acc
+    if updates:
+        try:
+            set_local_storage_values(state_path, origin=origin, updates=updates)
+        except Exception:
+            pass
+    return new_acc or acc_id, new_chain or chain_sa
 
 
 def _get_local_storage(state: dict, origin: str) -> dict:
@@ -196,31 +356,22 @@ def extract_account_from_browser_state(state_path: Path, *, origin: str) -> tupl
 
     Supports both raw localStorage format (flat key-value) and Playwright format.
     """
-    if not state_path.exists():
+    local_storage = _try_load_local_storage(state_path, origin)
+    if local_storage is None:
         raise FileNotFoundError(f"Browser state not found: {state_path}")
 
-    with open(state_path, "r", encoding="utf-8") as f:
-        state = json.load(f)
-
-    # Determine format: raw localStorage (has grvt_ss_on_chain at top level) vs Playwright (has origins)
-    if "grvt_ss_on_chain" in state:
-        # Raw localStorage format
-        local_storage = state
-    else:
-        # Playwright format
-        local_storage = {}
-        for entry in state.get("origins", []):
-            if entry.get("origin") == origin:
-                local_storage = {item["name"]: item["value"] for item in entry.get("localStorage", []) if "name" in item}
-                break
-
     sk_raw = local_storage.get("grvt_ss_on_chain", "") or ""
     if not sk_raw:
         raise ValueError(f"Could not extract account info from {state_path}")
 
-    # Stored as a JSON string, may contain unicode escapes
-    sk_str = sk_raw.strip('"').encode().decode("unicode_escape")
-    sk = json.loads(sk_str)
+    # Stored via JSON.stringify of the key map, i.e. a JSON-encoded JSON string.
+    try:
+        sk = json_compat.loads(sk_raw)
+        if isinstance(sk, str):
+            sk = json_compat.loads(sk)
+    except json_compat.JSONDecodeError:
+        # Legacy/hand-edited values: unquote and resolve escapes manually.
+        sk = json_compat.loads(sk_raw.strip('"').encode().decode("unicode_escape"))
 
     for user_id, data in sk.items():
         session_private_key = data.get("privateKey")
@@ -231,11 +382,7 @@ def extract_account_from_browser_state(state_path: Path, *, origin: str) -> tupl
 
 def set_local_storage_values(state_path: Path, *, origin: str, updates: dict[str, str]) -> None:
     """Persist localStorage updates into a Playwright storage-state file."""
-    if not state_path.exists():
-        raise FileNotFoundError(state_path)
-
-    with open(state_path, "r", encoding="utf-8") as f:
-        state = json.load(f)
+    state = json_compat.loads(state_path.read_bytes())
 
     if "origins" not in state:
         raise ValueError("State file is not Playwright storage-state format")
@@ -260,8 +407,17 @@ def set_local_storage_values(state_path: Path, *, origin: str, updates: dict[str
             ls.append({"name": k, "value": str(v)})
     entry["localStorage"] = ls
 
-    with open(state_path, "w", encoding="utf-8") as f:
-        json.dump(state, f, indent=2)
+    write_storage_state(state_path, state)
+
+
+def write_storage_state(state_path: Path, state: dict) -> None:
+    """Persist a Playwright storage-state dict (cookie refresh and localStorage updates share this).
+
+    Machine-read file: compact JSON unless GRVT_PRETTY_STATE asks for readable output. Written
+    atomically so a crash mid-write can't truncate the session.
+    """
+    state_path.parent.mkdir(parents=True, exist_ok=True)
+    atomic_write_bytes(state_path, json_compat.dumps(state, indent=env_flag("GRVT_PRETTY_STATE")))
 
 
 def fetch_subaccounts(state_path: Path, *, origin: str) -> list[dict]:
@@ -276,83 +432,4 @@ def fetch_subaccounts(state_path: Path, *, origin: str) -> list[dict]:
     if not state_path.exists():
         raise FileNotFoundError(state_path)
 
-    from grvt_volume_boost.settings import EDGE_URL
-
-    query = """query UserSubAccountsQuery {
-  userSubAccounts {
-    data {
-      subAccounts {
-        subAccount {
-          id
-          name
-          chainSubAccountID
-          accountID
-        }
-      }
-    }
-  }
-}
-"""
-
-    def _run() -> dict:
-        from playwright.sync_api import sync_playwright
-        from playwright_stealth import Stealth
-        from grvt_volume_boost.runtime import ensure_playwright_browsers_path
-
-        ensure_playwright_browsers_path()
-        with sync_playwright() as p:
-            stealth = Stealth()
-            stealth.hook_playwright_context(p)
-            browser = p.chromium.launch(
-                headless=True,
-                args=["--headless=new", "--disable-blink-features=AutomationControlled"],
-                channel="chrome",
-            )
-            context = browser.new_context(storage_state=str(state_path), viewport={"width": 1280, "height": 720}, locale="en-US")
-            page = context.new_page()
-            page.goto(origin, wait_until="domcontentloaded", timeout=60000)
-
-            data = page.evaluate(
-                """async ({query, edgeUrl}) => {
-                    const cidRaw = window.localStorage.getItem('grvt:client_id');
-                    let cid = null;
-                    if (cidRaw) {
-                      try { cid = JSON.parse(cidRaw); } catch(e) { cid = cidRaw; }
-                    }
-                    const headers = { 'content-type': 'application/json', 'x-api-source': 'WEB' };
-                    if (cid) headers['x-client-session-id'] = String(cid);
-                    try { headers['x-trace-id'] = crypto.randomUUID(); } catch(e) {}
-                    headers['x-device-fingerprint'] = `UserAgent=${navigator.userAgent}`;
-                     const resp = await fetch(edgeUrl + '/query', {
-                       method: 'POST',
-                       headers,
-                       credentials: 'include',
-                       body: JSON.stringify({ query })
-                     });
-                    const text = await resp.text();
-                    try { return JSON.parse(text); } catch(e) { return { errors:[{message:'non-json'}], _text: text.slice(0,200), _status: resp.status }; }
-                }""",
-                {"query": query, "edgeUrl": EDGE_URL},
-            )
-
-            context.storage_state(path=str(state_path))
-            browser.close()
-            return data or {}
-
-    data = run_sync_playwright(_run)
-
-    subs = (((data or {}).get("data") or {}).get("userSubAccounts") or {}).get("data") or {}
-    out = []
-    for entry in subs.get("subAccounts", []) or []:
-        sa = (entry or {}).get("subAccount") or {}
-        if not sa:
-            continue
-        out.append(
-            {
-                "id": sa.get("id"),
-                "name": sa.get("name"),
-                "chainSubAccountID": str(sa.get("chainSubAccountID")) if sa.get("chainSubAccountID") is not None else None,
-                "accountID": sa.get("accountID"),
-            }
-        )
-    return out
+    return [dict(sa) for sa in _subaccounts(state_path, origin)]
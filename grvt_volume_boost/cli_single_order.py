@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import argparse
 import json
+import os
 import sys
 import time
 from decimal import Decimal
@@ -18,6 +19,14 @@ from grvt_volume_boost.sizing import normalize_size
 from grvt_volume_boost.settings import SESSION_DIR
 
 
+def _file_signature(path: str) -> tuple[int, int] | None:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
 def main(argv: list[str] | None = None) -> int:
     load_dotenv(".env")
 
@@ -44,12 +53,20 @@ def main(argv: list[str] | None = None) -> int:
     if args.qr_image:
         deadline = time.time() + float(args.qr_watch or 0.0)
         last_url: str | None = None
+        last_sig: tuple[int, int] | None = None
         while True:
-            url = decode_qr_image(args.qr_image)
+            # Only decode when the image file actually changed; a stat is far cheaper than a decode.
+            url = None
+            sig = _file_signature(args.qr_image)
+            if sig is not None and sig != last_sig:
+                last_sig = sig
+                url = decode_qr_image(args.qr_image)
             if not url:
                 if args.qr_watch and time.time() < deadline:
                     time.sleep(1.0)
                     continue
+                if last_url is not None:
+                    return 1
                 print("Failed to decode QR image.", file=sys.stderr)
                 return 2
 
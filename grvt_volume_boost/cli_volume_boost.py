@@ -1,17 +1,20 @@
 from __future__ import annotations
 
 import argparse
-import json
+import atexit
 import os
 import random
 import signal
 import sys
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from decimal import Decimal
 
 from dotenv import load_dotenv
 
+from grvt_volume_boost import json_compat
 from grvt_volume_boost.auth.cookies import get_cookies_parallel
 from grvt_volume_boost.config import get_all_accounts
 from grvt_volume_boost.direction import (
@@ -30,6 +33,8 @@ from grvt_volume_boost.strategy import run_instant_round, run_normal_mode
 _shutdown_requested = False
 _active_accounts = []  # [(acc, cookie, instrument, inst_info), ...]
 _log_file: str | None = None
+_log_fh = None  # lazily opened handle for _log_file, kept open for the run
+_log_lock = threading.Lock()  # guards the lazy open and keeps concurrent entries whole
 _use_color = False
 
 
@@ -51,16 +56,25 @@ def _c(s: str, code: str) -> str:
 
 
 def _log(level: str, msg: str) -> None:
-    timestamp = datetime.now().isoformat()
     print(f"[{level}] {msg}")
     if _log_file:
         try:
-            with open(_log_file, "a", encoding="utf-8") as f:
-                f.write(json.dumps({"ts": timestamp, "level": level, "msg": msg}) + "\n")
+            line = json_compat.dumps({"ts": datetime.now().isoformat(), "level": level, "msg": msg}).decode() + "\n"
+            with _log_lock:
+                (_log_fh or _open_log()).write(line)
         except Exception:
             pass
 
 
+def _open_log():
+    """Open the log file once; call with _log_lock held."""
+    global _log_fh
+    # Line-buffered: each entry reaches the file immediately (tail -f, hard kills).
+    _log_fh = open(_log_file, "a", encoding="utf-8", buffering=1)
+    atexit.register(_log_fh.close)
+    return _log_fh
+
+
 def _alert(msg: str, *, critical: bool = False) -> None:
     level = "CRITICAL" if critical else "WARN"
     _log(level, msg)
@@ -155,18 +169,22 @@ def main(argv: list[str] | None = None) -> None:
     print(f"\nAccount 1 (primary): {pair.primary.name} (sub_account_id={pair.primary.sub_account_id})")
     print(f"Account 2: {pair.secondary.name} (sub_account_id={pair.secondary.sub_account_id})")
 
-    print("\nGetting cookies...")
-    cookie_primary, cookie_secondary = get_cookies_parallel(
-        pair.primary.browser_state_path, pair.secondary.browser_state_path
-    )
-    if not cookie_primary or not cookie_secondary:
-        _alert("Failed to get cookies", critical=True)
-        return
-    print("Cookies OK\n")
-
     from grvt_volume_boost.clients.market_data import get_instrument, get_ticker
 
-    inst_info = get_instrument(args.market)
+    # Instrument metadata is public; fetch it while the (slower) cookie refresh runs.
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        inst_future = pool.submit(get_instrument, args.market)
+
+        print("\nGetting cookies...")
+        cookie_primary, cookie_secondary = get_cookies_parallel(
+            pair.primary.browser_state_path, pair.secondary.browser_state_path
+        )
+        if not cookie_primary or not cookie_secondary:
+            _alert("Failed to get cookies", critical=True)
+            return
+        print("Cookies OK\n")
+
+        inst_info = inst_future.result()
     if args.notional_usd is not None:
         notional = Decimal(str(args.notional_usd))
         ticker = get_ticker(args.market)
@@ -274,8 +292,11 @@ def main(argv: list[str] | None = None) -> None:
         print(f"Total volume: ${total_volume:,.2f}")
 
     print("\nFinal positions:")
-    for acc, cookie, instrument, _ in _active_accounts:
-        pos = get_position_size(acc, cookie, instrument)
+    with ThreadPoolExecutor(max_workers=len(_active_accounts)) as pool:
+        positions = list(
+            pool.map(lambda entry: get_position_size(entry[0], entry[1], entry[2]), _active_accounts)
+        )
+    for (acc, _, _, _), pos in zip(_active_accounts, positions):
         status = "✓" if pos == 0 else "⚠"
         print(f"  {status} {acc.name}: {pos or 0}")
     print("=" * 60)
@@ -2,16 +2,15 @@ from __future__ import annotations
 
 import argparse
 import asyncio
-import json
 import random
 import time
 from dataclasses import dataclass
 from decimal import Decimal, ROUND_DOWN
-from typing import Any
 
 import websockets
 from dotenv import load_dotenv
 
+from grvt_volume_boost import json_compat
 from grvt_volume_boost.auth.cookies import load_cookie_cache
 from grvt_volume_boost.clients.market_data import get_instrument, get_ticker
 from grvt_volume_boost.clients.trades import post as trades_post
@@ -20,6 +19,7 @@ from grvt_volume_boost.services.orders import cancel_all_orders, cancel_order, g
 from grvt_volume_boost.services.signing import sign_order
 from grvt_volume_boost.sizing import mid_price_from_ticker, normalize_size
 from grvt_volume_boost.settings import SIGNATURE_EXPIRATION_SEC, WS_URL
+from grvt_volume_boost.util import deep_contains, deep_contains_any, ws_result
 from grvt_volume_boost.ws_compat import connect as ws_connect
 
 
@@ -33,30 +33,13 @@ def _decimal_field(inst_info: dict, key: str, default: str = "0") -> Decimal:
 def _round_to_tick(price: Decimal, tick: Decimal) -> Decimal:
     if tick <= 0:
         return price
+    if tick.as_tuple().digits == (1,):
+        # Power-of-ten tick (0.01, 1, ...): a single quantize is the same rounding.
+        return price.quantize(tick, rounding=ROUND_DOWN)
     steps = (price / tick).to_integral_value(rounding=ROUND_DOWN)
     return (steps * tick).quantize(tick, rounding=ROUND_DOWN)
 
 
-def _deep_contains(obj: Any, needle: str) -> bool:
-    """Best-effort recursive search for `needle` in dict/list/strings."""
-    if obj is None:
-        return False
-    if isinstance(obj, str):
-        return needle in obj
-    if isinstance(obj, (int, float, bool)):
-        return False
-    if isinstance(obj, dict):
-        for k, v in obj.items():
-            if isinstance(k, str) and needle in k:
-                return True
-            if _deep_contains(v, needle):
-                return True
-        return False
-    if isinstance(obj, list):
-        return any(_deep_contains(v, needle) for v in obj)
-    return False
-
-
 def _extract_oid(order_data: dict) -> str | None:
     feed = order_data.get("feed") if isinstance(order_data, dict) else None
     if isinstance(feed, dict):
@@ -93,12 +76,13 @@ def _build_order_payload(
     inst_hash = inst_info["instrument_hash"]
     asset_id = int(inst_hash, 16) if str(inst_hash).startswith("0x") else int(inst_hash)
 
-    contract_size = int((size * (Decimal(10) ** base_decimals)).to_integral_value(rounding=ROUND_DOWN))
+    # scaleb shifts the exponent (no multiply); int() truncates toward zero like ROUND_DOWN.
+    contract_size = int(size.scaleb(base_decimals))
     limit_price = 0
     if not is_market:
         if price is None:
             raise ValueError("price is required for limit orders")
-        limit_price = int((price * (Decimal(10) ** 9)).to_integral_value(rounding=ROUND_DOWN))  # 9 decimals
+        limit_price = int(price.scaleb(9))  # 9 decimals
 
     # Docs: unix nanoseconds, capped at 30 days. Use a conservative default.
     expiration_ns = int(time.time_ns() + SIGNATURE_EXPIRATION_SEC * 1_000_000_000)
@@ -156,21 +140,22 @@ async def _ws_connect_and_subscribe(cookie: str, *, main_account_id: str, stream
         close_timeout=2,
     )
     await ws.send(
-        json.dumps(
+        json_compat.dumps(
             {
                 "jsonrpc": "2.0",
                 "method": "subscribe",
                 "params": {"stream": stream, "selectors": selectors},
                 "id": 1,
             }
-        )
+        ).decode()
     )
     return ws
 
 
 async def _place_limit_then_cancel(*, acc, cookie: str, instrument: str, size: Decimal, is_buying: bool) -> None:
-    inst_info = get_instrument(instrument)
-    ticker = get_ticker(instrument)
+    inst_info, ticker = await asyncio.gather(
+        asyncio.to_thread(get_instrument, instrument), asyncio.to_thread(get_ticker, instrument)
+    )
     mid = mid_price_from_ticker(ticker)
     tick = _decimal_field(inst_info, "tick_size", "0.0")
     min_notional = _decimal_field(inst_info, "min_notional", "0")
@@ -194,7 +179,7 @@ async def _place_limit_then_cancel(*, acc, cookie: str, instrument: str, size: D
     if far_price <= 0:
         raise RuntimeError(f"Computed far price invalid: {far_price}")
 
-    nonce = random.randint(0, 2**32 - 1)
+    nonce = random.getrandbits(32)
     intent = LimitOrderIntent(instrument=instrument, size=size, is_buying=is_buying, price=far_price, nonce=nonce)
 
     payload = _build_order_payload(
@@ -216,14 +201,18 @@ async def _place_limit_then_cancel(*, acc, cookie: str, instrument: str, size: D
         stream="v1.order",
         selectors=[f"{acc.sub_account_id}-{instrument}"],
     )
+    loop = asyncio.get_running_loop()
     try:
-        r = trades_post("/lite/v1/create_order", acc=acc, cookie=cookie, payload=payload, timeout=30)
+        # Blocking HTTP runs off the event loop so WS frames keep being read meanwhile.
+        r = await asyncio.to_thread(
+            trades_post, "/lite/v1/create_order", acc=acc, cookie=cookie, payload=payload, timeout=30
+        )
         try:
-            created = r.json()
+            created = json_compat.loads(r.content)
         except Exception:
             created = {"status_code": r.status_code, "text": r.text}
         print("[REST] create_order response:")
-        print(json.dumps(created, indent=2))
+        print(json_compat.dumps(created, indent=True).decode())
 
         # If the order was rejected, don't wait on WS for it.
         if r.status_code != 200 or (isinstance(created, dict) and created.get("s") in (400, 401, 403)):
@@ -232,36 +221,40 @@ async def _place_limit_then_cancel(*, acc, cookie: str, instrument: str, size: D
         # Build a few string "needles" to match the WS payload (format varies).
         size_needles = {str(intent.size), str(intent.size.normalize()), f"{intent.size:f}".rstrip("0").rstrip(".")}
         price_needles = {str(intent.price), str(intent.price.normalize()), f"{intent.price:f}".rstrip("0").rstrip(".")}
-        needles = {str(intent.nonce), intent.instrument, *size_needles, *price_needles}
+        # All needles are collected in a single walk of each update's keys and string values.
+        nonce_s = str(intent.nonce)
+        needles = tuple(dict.fromkeys((nonce_s, intent.instrument, *price_needles, *size_needles)))
 
         oid: str | None = None
-        start = time.time()
+        deadline = loop.time() + 15.0
         seen = 0
         last_order_data: dict | None = None
-        while time.time() - start < 15.0:
+        while (remaining := deadline - loop.time()) > 0:
+            # One timer per frame for the rest of the window, instead of waking every second.
             try:
-                raw = await asyncio.wait_for(ws.recv(), timeout=1.0)
-            except TimeoutError:
-                continue
+                raw = await asyncio.wait_for(ws.recv(), timeout=remaining)
+            except asyncio.TimeoutError:
+                break
             try:
-                msg = json.loads(raw)
-            except json.JSONDecodeError:
+                msg = json_compat.loads(raw)
+            except json_compat.JSONDecodeError:
                 continue
-            order_data = msg.get("params", {}).get("result", msg.get("result", msg))
+            order_data = ws_result(msg)
             if not isinstance(order_data, dict):
                 continue
             seen += 1
             last_order_data = order_data
 
             # Prefer matching by nonce/client-order-id, but fall back to matching by instrument+price+size.
-            if _deep_contains(order_data, str(intent.nonce)) or (
-                _deep_contains(order_data, intent.instrument)
-                and any(_deep_contains(order_data, n) for n in price_needles)
-                and any(_deep_contains(order_data, n) for n in size_needles)
+            hits = deep_contains_any(order_data, needles)
+            if nonce_s in hits or (
+                intent.instrument in hits
+                and not hits.isdisjoint(price_needles)
+                and not hits.isdisjoint(size_needles)
             ):
                 oid = _extract_oid(order_data)
                 print("[WS] Matched order update:")
-                print(json.dumps(order_data, indent=2))
+                print(json_compat.dumps(order_data, indent=True).decode())
                 break
 
         if not oid:
@@ -271,38 +264,42 @@ async def _place_limit_then_cancel(*, acc, cookie: str, instrument: str, size: D
                 print("[WS] Could not determine order_id/oid from WS.")
                 if last_order_data:
                     print("[WS] Last order message seen:")
-                    print(json.dumps(last_order_data, indent=2))
+                    print(json_compat.dumps(last_order_data, indent=True).decode())
 
             # Fallback: cancel all open orders for this sub-account (usually only the one we just created).
-            ok_all = cancel_all_orders(acc, cookie)
+            ok_all = await asyncio.to_thread(cancel_all_orders, acc, cookie)
             print(f"[CANCEL] cancel_all_orders() fallback => {ok_all}")
             return
 
-        ok = cancel_order(acc, cookie, oid)
+        ok = await asyncio.to_thread(cancel_order, acc, cookie, oid)
         print(f"[CANCEL] cancel_order({oid}) => {ok}")
 
-        start = time.time()
-        while time.time() - start < 10.0:
+        deadline = loop.time() + 10.0
+        while (remaining := deadline - loop.time()) > 0:
+            # One timer per frame for the rest of the window, instead of waking every second.
             try:
-                raw = await asyncio.wait_for(ws.recv(), timeout=1.0)
-            except TimeoutError:
-                continue
+                raw = await asyncio.wait_for(ws.recv(), timeout=remaining)
+            except asyncio.TimeoutError:
+                break
             try:
-                msg = json.loads(raw)
-            except json.JSONDecodeError:
+                msg = json_compat.loads(raw)
+            except json_compat.JSONDecodeError:
                 continue
-            order_data = msg.get("params", {}).get("result", msg.get("result", msg))
-            if isinstance(order_data, dict) and _deep_contains(order_data, oid):
+            order_data = ws_result(msg)
+            if isinstance(order_data, dict) and deep_contains(order_data, oid):
                 print("[WS] Order update after cancel:")
-                print(json.dumps(order_data, indent=2))
+                print(json_compat.dumps(order_data, indent=True).decode())
                 break
     finally:
         await ws.close()
 
 
 async def _close_position_if_any(*, acc, cookie: str, instrument: str) -> bool:
-    inst_info = get_instrument(instrument)
-    pos = get_position_size(acc, cookie, instrument)
+    # Both lookups are blocking REST calls: run them concurrently, off the event loop.
+    inst_info, pos = await asyncio.gather(
+        asyncio.to_thread(get_instrument, instrument),
+        asyncio.to_thread(get_position_size, acc, cookie, instrument),
+    )
     if pos is None:
         raise RuntimeError("Failed to read position (auth/cookie issue?)")
     if pos == 0:
@@ -312,7 +309,7 @@ async def _close_position_if_any(*, acc, cookie: str, instrument: str) -> bool:
     size = abs(Decimal(pos))
     is_buying = pos < 0  # if short, buy to close; if long, sell to close
     print(f"[POS] Closing position: {instrument} pos={pos} with MARKET {'BUY' if is_buying else 'SELL'} size={size}")
-    nonce = random.randint(0, 2**32 - 1)
+    nonce = random.getrandbits(32)
     payload = _build_order_payload(
         acc=acc,
         instrument=instrument,
@@ -331,26 +328,37 @@ async def _close_position_if_any(*, acc, cookie: str, instrument: str) -> bool:
         stream="v1.order",
         selectors=[f"{acc.sub_account_id}-{instrument}"],
     )
+    loop = asyncio.get_running_loop()
     try:
-        r = trades_post("/lite/v1/create_order", acc=acc, cookie=cookie, payload=payload, timeout=30)
+        # Blocking HTTP runs off the event loop so WS frames keep being read meanwhile.
+        r = await asyncio.to_thread(
+            trades_post, "/lite/v1/create_order", acc=acc, cookie=cookie, payload=payload, timeout=30
+        )
         try:
-            created = r.json()
+            created = json_compat.loads(r.content)
         except Exception:
             created = {"status_code": r.status_code, "text": r.text}
         print("[REST] create_order response:")
-        print(json.dumps(created, indent=2))
+        print(json_compat.dumps(created, indent=True).decode())
 
-        start = time.time()
-        while time.time() - start < 10.0:
-            raw = await asyncio.wait_for(ws.recv(), timeout=1.0)
+        close_needles = (str(nonce), instrument)
+        deadline = loop.time() + 10.0
+        while (remaining := deadline - loop.time()) > 0:
+            # One timer per frame for the rest of the window, instead of waking every second.
             try:
-                msg = json.loads(raw)
-            except json.JSONDecodeError:
+                raw = await asyncio.wait_for(ws.recv(), timeout=remaining)
+            except asyncio.TimeoutError:
+                break
+            try:
+                msg = json_compat.loads(raw)
+            except json_compat.JSONDecodeError:
+                continue
+            order_data = ws_result(msg)
+            if not isinstance(order_data, dict):
                 continue
-            order_data = msg.get("params", {}).get("result", msg.get("result", msg))
-            if isinstance(order_data, dict) and _deep_contains(order_data, str(nonce)) and _deep_contains(order_data, instrument):
+            if len(deep_contains_any(order_data, close_needles)) == len(close_needles):
                 print("[WS] Matched close order update:")
-                print(json.dumps(order_data, indent=2))
+                print(json_compat.dumps(order_data, indent=True).decode())
                 break
     finally:
         await ws.close()
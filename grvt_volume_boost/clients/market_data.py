@@ -1,12 +1,15 @@
 from __future__ import annotations
 
 import os
+import threading
+import time
 from typing import Any
 
 import requests
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 
+from grvt_volume_boost import json_compat
 from grvt_volume_boost.settings import MARKET_DATA_URL
 
 # Module-level session with connection pooling for keep-alive
@@ -15,17 +18,24 @@ _adapter = HTTPAdapter(pool_connections=10, pool_maxsize=20, max_retries=Retry(t
 _session.mount("https://", _adapter)
 _session.mount("http://", _adapter)
 
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+# Instrument metadata (tick/size decimals, hash) is static in practice; cache it per process.
+_INSTRUMENT_TTL_SEC = 3600.0
+_instrument_cache: dict[tuple[str, bool], tuple[float, dict]] = {}
+_instrument_cache_lock = threading.Lock()
+
 
 def _post(path: str, payload: dict) -> dict[str, Any]:
-    r = _session.post(f"{MARKET_DATA_URL}{path}", json=payload, timeout=30)
+    r = _session.post(f"{MARKET_DATA_URL}{path}", data=json_compat.dumps(payload), headers=_JSON_HEADERS, timeout=30)
     r.raise_for_status()
-    return r.json()
+    return json_compat.loads(r.content)
 
 
 def _post_base(base: str, path: str, payload: dict) -> dict[str, Any]:
-    r = _session.post(f"{base}{path}", json=payload, timeout=30)
+    r = _session.post(f"{base}{path}", data=json_compat.dumps(payload), headers=_JSON_HEADERS, timeout=30)
     r.raise_for_status()
-    return r.json()
+    return json_compat.loads(r.content)
 
 
 def _base_url(*, testnet: bool) -> str:
@@ -40,8 +50,19 @@ def get_all_instruments(testnet: bool = False) -> list[dict]:
 
 
 def get_instrument(instrument: str, testnet: bool = False) -> dict:
+    """Instrument metadata, cached for an hour; callers get their own shallow copy."""
+    key = (instrument, testnet)
+    now = time.monotonic()
+    with _instrument_cache_lock:
+        hit = _instrument_cache.get(key)
+    if hit is not None and now - hit[0] < _INSTRUMENT_TTL_SEC:
+        return dict(hit[1])
     base = _base_url(testnet=testnet)
-    return _post_base(base, "/full/v1/instrument", {"instrument": instrument}).get("result", {})
+    result = _post_base(base, "/full/v1/instrument", {"instrument": instrument}).get("result", {})
+    if result:
+        with _instrument_cache_lock:
+            _instrument_cache[key] = (now, result)
+    return dict(result)
 
 
 def get_ticker(instrument: str, testnet: bool = False) -> dict:
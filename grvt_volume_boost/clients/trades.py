@@ -1,9 +1,12 @@
 from __future__ import annotations
 
+import functools
+
 import requests
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 
+from grvt_volume_boost import json_compat
 from grvt_volume_boost.config import AccountConfig
 from grvt_volume_boost.settings import ORIGIN, TRADES_URL
 
@@ -15,15 +18,23 @@ _session.mount("http://", _adapter)
 
 
 def make_headers(acc: AccountConfig, cookie: str) -> dict[str, str]:
+    return dict(_headers(acc.main_account_id, cookie))
+
+
+@functools.lru_cache(maxsize=8)
+def _headers(main_account_id: str, cookie: str) -> dict[str, str]:
+    # Only changes when the cookie rotates; make_headers hands out copies of this.
     return {
         "Content-Type": "application/json",
         "Origin": ORIGIN,
         "Referer": f"{ORIGIN}/",
         "X-Api-Source": "WEB",
-        "X-Grvt-Account-Id": acc.main_account_id,
+        "X-Grvt-Account-Id": main_account_id,
         "Cookie": f"gravity={cookie}",
     }
 
 
 def post(path: str, *, acc: AccountConfig, cookie: str, payload: dict, timeout: float = 30) -> requests.Response:
-    return _session.post(f"{TRADES_URL}{path}", json=payload, headers=make_headers(acc, cookie), timeout=timeout)
+    # Pre-serialize with json_compat (orjson when available); the headers already set Content-Type.
+    # requests merges headers into its own dict, so the cached mapping is never mutated.
+    return _session.post(f"{TRADES_URL}{path}", data=json_compat.dumps(payload), headers=_headers(acc.main_account_id, cookie), timeout=timeout)
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
 
@@ -68,16 +69,21 @@ def get_all_accounts() -> tuple[list[AccountConfig], list[str]]:
     accounts: list[AccountConfig] = []
     errors: list[str] = []
 
-    for num in (1, 2):
-        state_path = _state_file_for_account(num)
+    # Each account parses its own storage-state file (and may hit the edge API to backfill IDs),
+    # so load them concurrently; results are still collected in account order.
+    futures: dict[int, Future[AccountConfig] | None] = {}
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        for num in (1, 2):
+            futures[num] = pool.submit(get_account, num) if _state_file_for_account(num).exists() else None
 
+    for num, fut in futures.items():
         # Check session file
-        if not state_path.exists():
-            errors.append(f"Account {num}: Session file not found: {state_path.name}")
+        if fut is None:
+            errors.append(f"Account {num}: Session file not found: {_state_file_for_account(num).name}")
             continue
 
         try:
-            accounts.append(get_account(num))
+            accounts.append(fut.result())
         except ValueError as e:
             msg = str(e)
             if "grvt_ss_on_chain" in msg or "account info" in msg:
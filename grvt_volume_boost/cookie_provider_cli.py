@@ -9,6 +9,7 @@ from pathlib import Path
 from grvt_volume_boost.auth.cookies import (
     DEFAULT_COOKIE_REFRESH_INTERVAL_SEC,
     get_fresh_cookie,
+    get_fresh_cookie_with_ttl,
     load_cookie_cache,
     save_cookie_cache,
 )
@@ -28,29 +29,35 @@ def _mask_secret(value: str, *, prefix: int = 12) -> str:
 
 
 def serve_cookies(*, state_file: Path, refresh_interval_sec: int) -> None:
-    """Run as a service, refreshing cookies periodically."""
+    """Run as a service, refreshing cookies periodically.
+
+    Sleeps until shortly before the cookie's own expiry, capped at `refresh_interval_sec`
+    (which keeps the on-disk cache timestamp fresh for `load_cookie_cache` readers).
+    """
     print("=" * 60)
     print("GRVT Cookie Refresh Service")
     print("=" * 60)
     print(f"State file: {state_file}")
-    print(f"Refresh interval: {refresh_interval_sec} seconds")
+    print(f"Refresh interval: up to {refresh_interval_sec} seconds")
     print("=" * 60)
 
     while True:
         now = datetime.now().strftime("%H:%M:%S")
+        delay = float(refresh_interval_sec)
         try:
-            gravity = get_fresh_cookie(state_file)
+            gravity, ttl = get_fresh_cookie_with_ttl(state_file)
             if gravity:
                 save_cookie_cache(gravity)
                 print(f"[{now}] Cookie refreshed: {gravity[:12]}...")
+                delay = min(delay, ttl)
             else:
                 print(f"[{now}] Failed to get cookie - manual login required")
                 break
         except Exception as e:
             print(f"[{now}] Error: {e}")
 
-        print(f"[{now}] Sleeping for {refresh_interval_sec} seconds...")
-        time.sleep(refresh_interval_sec)
+        print(f"[{now}] Sleeping for {int(delay)} seconds...")
+        time.sleep(delay)
 
 
 def main(argv: list[str] | None = None) -> None:
@@ -71,7 +78,7 @@ def main(argv: list[str] | None = None) -> None:
         "--refresh-interval",
         type=int,
         default=DEFAULT_COOKIE_REFRESH_INTERVAL_SEC,
-        help="Cookie refresh interval seconds (default: 900)",
+        help="Maximum seconds between refresh checks (default: 900)",
     )
 
     args = parser.parse_args(argv)
@@ -1,8 +1,9 @@
 from __future__ import annotations
 
 import time
+from concurrent.futures import ThreadPoolExecutor
 
-from grvt_volume_boost.auth.cookies import get_fresh_cookie
+from grvt_volume_boost.auth.cookies import get_cookies_parallel
 from grvt_volume_boost.clients.market_data import get_instrument
 from grvt_volume_boost.config import get_all_accounts
 from grvt_volume_boost.services.orders import get_margin_ratio
@@ -39,32 +40,34 @@ def run_doctor() -> bool:
         else:
             errors.append(f"{acc.name}: browser state not found at {acc.browser_state_path}")
 
-    print("\n[3/4] Getting fresh cookies...")
-    cookies: dict[str, str] = {}
-    for acc in accounts:
-        cookie = get_fresh_cookie(acc.browser_state_path)
-        if cookie:
-            cookies[acc.name] = cookie
-            print(f"  ✓ {acc.name}: cookie OK (len={len(cookie)})")
-        else:
-            errors.append(f"{acc.name}: failed to get cookie")
+    with ThreadPoolExecutor(max_workers=max(2, len(accounts))) as pool:
+        # The market-data check needs no auth; run it while cookies are refreshed.
+        inst_future = pool.submit(get_instrument, "BTC_USDT_Perp")
 
-    print("\n[4/4] Testing API connectivity...")
-    try:
-        get_instrument("BTC_USDT_Perp")
-        print("  ✓ Market data API: OK")
-    except Exception as e:
-        errors.append(f"Market data API error: {e}")
+        print("\n[3/4] Getting fresh cookies...")
+        cookies: dict[str, str] = {}
+        fresh = get_cookies_parallel(*(acc.browser_state_path for acc in accounts)) if accounts else ()
+        for acc, cookie in zip(accounts, fresh):
+            if cookie:
+                cookies[acc.name] = cookie
+                print(f"  ✓ {acc.name}: cookie OK (len={len(cookie)})")
+            else:
+                errors.append(f"{acc.name}: failed to get cookie")
 
-    for acc in accounts:
-        cookie = cookies.get(acc.name)
-        if not cookie:
-            continue
-        margin = get_margin_ratio(acc, cookie)
-        if margin is not None:
-            print(f"  ✓ {acc.name} margin ratio: {margin:.1%}")
-        else:
-            errors.append(f"{acc.name}: failed to get margin (API auth issue?)")
+        print("\n[4/4] Testing API connectivity...")
+        try:
+            inst_future.result()
+            print("  ✓ Market data API: OK")
+        except Exception as e:
+            errors.append(f"Market data API error: {e}")
+
+        authed = [acc for acc in accounts if cookies.get(acc.name)]
+        margins = pool.map(lambda acc: get_margin_ratio(acc, cookies[acc.name]), authed)
+        for acc, margin in zip(authed, margins):
+            if margin is not None:
+                print(f"  ✓ {acc.name} margin ratio: {margin:.1%}")
+            else:
+                errors.append(f"{acc.name}: failed to get margin (API auth issue?)")
 
     print("\n" + "=" * 60)
     if errors:
@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import functools
 import os
 import queue
 import random
@@ -11,7 +12,7 @@ import time
 import tkinter as tk
 import tkinter.font as tkfont
 import webbrowser
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
 from dataclasses import dataclass
 from decimal import Decimal
 from pathlib import Path
@@ -58,8 +59,6 @@ from grvt_volume_boost.price_monitor import TickerMonitor
 from grvt_volume_boost.ws_monitor import PositionWSManager
 from grvt_volume_boost.ws import OrderStreamClient
 
-load_dotenv(".env")
-
 EXCLUDED_BASES: set[str] = set()  # No exclusions - include all markets
 
 SIZE_TYPE_CONTRACTS = "Contracts"
@@ -112,6 +111,81 @@ def _enable_windows_dpi_awareness() -> None:
 
 _enable_windows_dpi_awareness()
 
+# UI scale per toplevel path. DPI only changes when a window moves to another monitor, so the
+# value is computed once and dropped on the toplevel's <Configure>/<Destroy>.
+_DPI_CACHE: dict[str, float] = {}
+_DPI_BOUND: set[str] = set()
+
+
+@functools.lru_cache(maxsize=1)
+def _win32_dlls():
+    """Load user32/gdi32 once and fix their ctypes prototypes (Windows only).
+
+    Shared by the DPI queries and the QR region capture; explicit HWND/HDC/HANDLE types avoid
+    64-bit handle truncation ("bad window path"-like failures).
+    """
+    import ctypes
+    from ctypes import wintypes
+
+    user32 = ctypes.WinDLL("user32", use_last_error=True)
+    gdi32 = ctypes.WinDLL("gdi32", use_last_error=True)
+
+    # Missing on older Windows; callers use getattr(..., None).
+    get_dpi_for_window = getattr(user32, "GetDpiForWindow", None)
+    if get_dpi_for_window is not None:
+        get_dpi_for_window.argtypes = [wintypes.HWND]
+        get_dpi_for_window.restype = ctypes.c_uint
+    get_dpi_for_system = getattr(user32, "GetDpiForSystem", None)
+    if get_dpi_for_system is not None:
+        get_dpi_for_system.argtypes = []
+        get_dpi_for_system.restype = ctypes.c_uint
+
+    user32.GetDC.argtypes = [wintypes.HWND]
+    user32.GetDC.restype = wintypes.HDC
+    user32.ReleaseDC.argtypes = [wintypes.HWND, wintypes.HDC]
+    user32.ReleaseDC.restype = ctypes.c_int
+
+    gdi32.GetDeviceCaps.argtypes = [wintypes.HDC, ctypes.c_int]
+    gdi32.GetDeviceCaps.restype = ctypes.c_int
+
+    gdi32.CreateCompatibleDC.argtypes = [wintypes.HDC]
+    gdi32.CreateCompatibleDC.restype = wintypes.HDC
+    gdi32.DeleteDC.argtypes = [wintypes.HDC]
+    gdi32.DeleteDC.restype = ctypes.c_int
+
+    gdi32.CreateDIBSection.argtypes = [
+        wintypes.HDC,
+        ctypes.c_void_p,
+        wintypes.UINT,
+        ctypes.POINTER(ctypes.c_void_p),
+        wintypes.HANDLE,
+        wintypes.DWORD,
+    ]
+    gdi32.CreateDIBSection.restype = wintypes.HANDLE
+    gdi32.GdiFlush.argtypes = []
+    gdi32.GdiFlush.restype = wintypes.BOOL
+
+    gdi32.SelectObject.argtypes = [wintypes.HDC, wintypes.HANDLE]
+    gdi32.SelectObject.restype = wintypes.HANDLE
+    gdi32.DeleteObject.argtypes = [wintypes.HANDLE]
+    gdi32.DeleteObject.restype = ctypes.c_int
+
+    gdi32.BitBlt.argtypes = [
+        wintypes.HDC,
+        ctypes.c_int,
+        ctypes.c_int,
+        ctypes.c_int,
+        ctypes.c_int,
+        wintypes.HDC,
+        ctypes.c_int,
+        ctypes.c_int,
+        wintypes.DWORD,
+    ]
+    gdi32.BitBlt.restype = wintypes.BOOL
+
+    return user32, gdi32
+
+
 def _ui_scale(widget: tk.Misc) -> float:
     """Best-effort UI scale factor (1.0 == 100% / 96 DPI).
 
@@ -121,49 +195,65 @@ def _ui_scale(widget: tk.Misc) -> float:
     Tk's pixels-per-inch.
     """
 
+    try:
+        top = widget.winfo_toplevel()
+        key = str(top)
+    except Exception:
+        return _compute_ui_scale(widget)
+
+    scale = _DPI_CACHE.get(key)
+    if scale is not None:
+        return scale
+
+    scale = _compute_ui_scale(widget)
+    _DPI_CACHE[key] = scale
+    if key not in _DPI_BOUND:
+        _DPI_BOUND.add(key)
+
+        def _invalidate(event, key=key) -> None:
+            # Toplevel bindings also fire for every child widget; only the toplevel's own events matter.
+            if str(event.widget) == key:
+                _DPI_CACHE.pop(key, None)
+                if event.type == tk.EventType.Destroy:
+                    _DPI_BOUND.discard(key)
+
+        try:
+            top.bind("<Configure>", _invalidate, add="+")
+            top.bind("<Destroy>", _invalidate, add="+")
+        except Exception:
+            pass
+    return scale
+
+
+def _compute_ui_scale(widget: tk.Misc) -> float:
     if os.name == "nt":
         try:
-            import ctypes
-            from ctypes import wintypes
+            user32, gdi32 = _win32_dlls()
 
             # Per-window DPI (best for per-monitor DPI); may return 96 before the window is mapped.
-            get_dpi_for_window = getattr(ctypes.windll.user32, "GetDpiForWindow", None)
+            get_dpi_for_window = getattr(user32, "GetDpiForWindow", None)
             if get_dpi_for_window is not None:
-                get_dpi_for_window.argtypes = [wintypes.HWND]
-                get_dpi_for_window.restype = ctypes.c_uint
                 dpi = int(get_dpi_for_window(widget.winfo_id()))
                 if dpi > 0 and dpi != 96:
                     return max(0.75, min(dpi / 96.0, 4.0))
 
             # System DPI fallback (more reliable at startup).
-            get_dpi_for_system = getattr(ctypes.windll.user32, "GetDpiForSystem", None)
+            get_dpi_for_system = getattr(user32, "GetDpiForSystem", None)
             if get_dpi_for_system is not None:
-                get_dpi_for_system.argtypes = []
-                get_dpi_for_system.restype = ctypes.c_uint
                 dpi = int(get_dpi_for_system())
                 if dpi > 0:
                     return max(0.75, min(dpi / 96.0, 4.0))
 
             # Older fallback: query primary screen device DPI via GDI.
             LOGPIXELSX = 88
-            get_dc = ctypes.windll.user32.GetDC
-            release_dc = ctypes.windll.user32.ReleaseDC
-            get_device_caps = ctypes.windll.gdi32.GetDeviceCaps
-            get_dc.argtypes = [wintypes.HWND]
-            get_dc.restype = wintypes.HDC
-            release_dc.argtypes = [wintypes.HWND, wintypes.HDC]
-            release_dc.restype = ctypes.c_int
-            get_device_caps.argtypes = [wintypes.HDC, ctypes.c_int]
-            get_device_caps.restype = ctypes.c_int
-
-            hdc = get_dc(0)
+            hdc = user32.GetDC(0)
             try:
-                dpi = int(get_device_caps(hdc, LOGPIXELSX))
+                dpi = int(gdi32.GetDeviceCaps(hdc, LOGPIXELSX))
                 if dpi > 0:
                     return max(0.75, min(dpi / 96.0, 4.0))
             finally:
                 try:
-                    release_dc(0, hdc)
+                    user32.ReleaseDC(0, hdc)
                 except Exception:
                     pass
         except Exception:
@@ -213,14 +303,35 @@ def _set_scaled_geometry(
         pass
 
 
+# Tk fonts are interpreter-wide, so one Font per (style, resolved spec) serves every window.
+_TTK_FONT_CACHE: dict[tuple[str, str], tkfont.Font] = {}
+# Heading widths keyed by (Tk font name, text); headings repeat across tables and re-layouts.
+_MEASURE_CACHE: dict[tuple[str, str], int] = {}
+
+
+# ttk styles are interpreter-wide; one Style wrapper per Tk interpreter is enough.
+_STYLE_CACHE: dict[object, ttk.Style] = {}
+
+
+def _style(widget: tk.Misc) -> ttk.Style:
+    style = _STYLE_CACHE.get(widget.tk)
+    if style is None:
+        style = _STYLE_CACHE[widget.tk] = ttk.Style(widget)
+    return style
+
+
 def _ttk_font(widget: tk.Misc, style_name: str, fallback: str = "TkDefaultFont") -> tkfont.Font:
     """Resolve ttk style font to a tk Font for measuring."""
     try:
-        style = ttk.Style(widget)
+        style = _style(widget)
         f = style.lookup(style_name, "font")
         if not f:
             f = fallback
-        return tkfont.Font(widget, font=f)
+        key = (style_name, str(f))
+        font = _TTK_FONT_CACHE.get(key)
+        if font is None:
+            font = _TTK_FONT_CACHE[key] = tkfont.Font(widget, font=f)
+        return font
     except Exception:
         try:
             return tkfont.nametofont(fallback)
@@ -230,10 +341,23 @@ def _ttk_font(widget: tk.Misc, style_name: str, fallback: str = "TkDefaultFont")
 
 def _fit_treeview_headings(tree: ttk.Treeview, headings: dict[str, str], *, base_widths: dict[str, int] | None = None) -> None:
     """Ensure columns are wide enough for localized header text (DPI/font-safe)."""
+    # Skip the re-fit when neither the (localized) headings nor the UI scale changed since the last one.
+    fit_key = (
+        round(_ui_scale(tree), 3),
+        tuple(headings.items()),
+        tuple(sorted(base_widths.items())) if base_widths else (),
+    )
+    if getattr(tree, "_fit_key", None) == fit_key:
+        return
     hfont = _ttk_font(tree, "Treeview.Heading")
+    # The Tk font name identifies the font without a Tcl round-trip (unlike font.actual()).
+    font_key = str(hfont)
     pad = _px(tree, 22)
     for col, text in headings.items():
-        want = int(hfont.measure(text)) + pad
+        width = _MEASURE_CACHE.get((font_key, text))
+        if width is None:
+            width = _MEASURE_CACHE[(font_key, text)] = int(hfont.measure(text))
+        want = width + pad
         if base_widths and col in base_widths:
             want = max(want, _px(tree, int(base_widths[col])))
         try:
@@ -242,12 +366,13 @@ def _fit_treeview_headings(tree: ttk.Treeview, headings: dict[str, str], *, base
             tree.column(col, width=want, minwidth=want, stretch=False)
         except Exception:
             pass
+    tree._fit_key = fit_key
 
 
 def _configure_treeview_rowheight(tree: ttk.Treeview) -> None:
     """Fix clipped rows at high Windows display scaling by adjusting rowheight."""
     try:
-        style = ttk.Style(tree)
+        style = _style(tree)
         font = _ttk_font(tree, "Treeview")
         linespace = int(font.metrics("linespace") or 0)
         want = max(linespace + _px(tree, 8), _px(tree, 20))
@@ -263,6 +388,15 @@ def _configure_treeview_rowheight(tree: ttk.Treeview) -> None:
         pass
 
 
+# Newlines/tabs in login events and errors would wrap or break the single-line status labels.
+_STATUS_TT = str.maketrans({"\n": " ", "\t": " ", "\r": None})
+
+
+def _status_line(msg: str, limit: int = 80) -> str:
+    # Slice first so a long traceback/payload isn't translated in full just to keep 80 chars.
+    return msg[: limit * 2].translate(_STATUS_TT)[:limit]
+
+
 class SetupWindow(tk.Toplevel):
     """Account setup window focused on QR login (no manual keys)."""
 
@@ -272,11 +406,21 @@ class SetupWindow(tk.Toplevel):
         self.title(_("setup.title"))
         _set_scaled_geometry(self, 560, 320)
         # QR codes are one-time use; store the decoded URL so we don't depend on re-decoding the image later.
-        self._qr_payloads: dict[int, dict] = {}  # account_num -> {"url": str, "image": PIL.Image | None}
+        self._qr_payloads: dict[int, dict] = {}  # account_num -> {"url": str}
         self._login_in_progress: set[int] = set()
         self._account_buttons: dict[int, list[tk.Widget]] = {}
+        self._state_paths: dict[int, Path] = {n: SESSION_DIR / f"grvt_browser_state_{n}.json" for n in (1, 2)}
+        # Login progress is coalesced: only the latest event per account is shown, at most every 50ms.
+        self._status_last: dict[int, str] = {}
+        self._status_scheduled: set[int] = set()
+        # Subaccount lookups (may start a headless browser) share one bounded pool instead of a thread per login.
+        self._io_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="grvt-setup")
         self._build_ui()
 
+    def destroy(self) -> None:
+        self._io_pool.shutdown(wait=False, cancel_futures=True)
+        super().destroy()
+
     def _build_ui(self) -> None:
         outer = ttk.Frame(self, padding=10)
         outer.pack(fill=tk.BOTH, expand=True)
@@ -295,11 +439,13 @@ class SetupWindow(tk.Toplevel):
 
     def _maybe_select_subaccount_async(self, account_num: int) -> None:
         """If multiple subaccounts exist, prompt the user to choose one."""
-        state_path = SESSION_DIR / f"grvt_browser_state_{account_num}.json"
+        state_path = self._state_paths[account_num]
 
-        def worker():
+        def done(fut) -> None:
+            if fut.cancelled():
+                return
             try:
-                subs = fetch_subaccounts(state_path, origin=ORIGIN)
+                subs = fut.result()
             except Exception:
                 subs = []
             try:
@@ -307,7 +453,11 @@ class SetupWindow(tk.Toplevel):
             except Exception:
                 pass
 
-        threading.Thread(target=worker, daemon=True).start()
+        try:
+            self._io_pool.submit(fetch_subaccounts, state_path, origin=ORIGIN).add_done_callback(done)
+        except RuntimeError:
+            # Window closed (pool shut down) between login completing and this call.
+            pass
 
     def _maybe_select_subaccount_ui(self, account_num: int, subs: list[dict]) -> None:
         if len(subs) <= 1:
@@ -330,7 +480,7 @@ class SetupWindow(tk.Toplevel):
         # Persist the chosen IDs into storage-state so the rest of the app uses the right subaccount.
         import json as _json
 
-        state_path = SESSION_DIR / f"grvt_browser_state_{account_num}.json"
+        state_path = self._state_paths[account_num]
         set_local_storage_values(
             state_path,
             origin=ORIGIN,
@@ -388,14 +538,15 @@ class SetupWindow(tk.Toplevel):
         status_var = self.acc1_qr_status if account_num == 1 else self.acc2_qr_status
         status_var.set(_("setup.select_region"))
 
-        # Hide window temporarily
+        # Hide window temporarily; open the overlay once the compositor has removed it, without
+        # blocking the Tk loop in the meantime.
         self.withdraw()
-        self.update()
-        time.sleep(0.3)
 
-        # Create selection overlay
-        selector = QRRegionSelector(self, account_num, self._on_qr_captured)
-        selector.grab_set()
+        def show_selector() -> None:
+            selector = QRRegionSelector(self, account_num, self._on_qr_captured)
+            selector.grab_set()
+
+        self.after(300, show_selector)
 
     def _on_qr_captured(self, account_num: int, image: "Image.Image | None") -> None:
         """Callback when QR region is captured."""
@@ -425,7 +576,7 @@ class SetupWindow(tk.Toplevel):
             status_var.set(_("setup.qr_not_grvt"))
             return
 
-        self._qr_payloads[account_num] = {"url": url, "image": image}
+        self._qr_payloads[account_num] = {"url": url}
         status_var.set(_("setup.qr_decoded"))
 
     def _select_qr_image(self, account_num: int) -> None:
@@ -455,7 +606,7 @@ class SetupWindow(tk.Toplevel):
             status_var.set(_("setup.qr_not_grvt"))
             return
 
-        self._qr_payloads[account_num] = {"url": url, "image": img}
+        self._qr_payloads[account_num] = {"url": url}
         status_var.set(_("setup.qr_decoded"))
 
     def _validate_qr(self, account_num: int) -> None:
@@ -477,7 +628,6 @@ class SetupWindow(tk.Toplevel):
                     url2 = decode_qr_from_pil(img)
                     if url2 and "qr-login" in url2:
                         url = url2
-                        self._qr_payloads[account_num] = {"url": url, "image": img}
             except Exception:
                 pass
             if not url:
@@ -492,36 +642,50 @@ class SetupWindow(tk.Toplevel):
         status_var.set(_("setup.logging_in"))
         self.update()
 
-        state_path = SESSION_DIR / f"grvt_browser_state_{account_num}.json"
+        state_path = self._state_paths[account_num]
 
         def do_login():
             # If email verification is required, prompt the user for the code (browser stays headless).
             def get_email_code() -> str | None:
-                ev = threading.Event()
-                box: dict[str, str | None] = {"v": None}
+                fut: Future[str | None] = Future()
 
                 def ask():
                     try:
-                        box["v"] = simpledialog.askstring(
-                            _("email_verify.title"),
-                            _("email_verify.body"),
-                            parent=self,
+                        fut.set_result(
+                            simpledialog.askstring(
+                                _("email_verify.title"),
+                                _("email_verify.body"),
+                                parent=self,
+                            )
                         )
-                    finally:
-                        ev.set()
+                    except Exception as e:
+                        fut.set_exception(e)
 
                 try:
                     self.after(0, ask)
                 except Exception:
                     ask()
-                ev.wait()
-                return box["v"]
+                try:
+                    # Matches session_key_timeout_sec below; a prompt nobody answers fails the login.
+                    return fut.result(timeout=600)
+                except Exception:
+                    return None
+
+            def flush_status() -> None:
+                self._status_scheduled.discard(account_num)
+                msg = self._status_last.pop(account_num, None)
+                if msg is not None:
+                    status_var.set(_status_line(msg))
 
             def on_event(msg: str) -> None:
+                self._status_last[account_num] = msg
+                if account_num in self._status_scheduled:
+                    return
+                self._status_scheduled.add(account_num)
                 try:
-                    self.after(0, lambda m=msg: status_var.set(m[:80]))
+                    self.after(50, flush_status)
                 except Exception:
-                    pass
+                    self._status_scheduled.discard(account_num)
 
             # QR login requires completing email verification; keep the browser visible and
             # wait until `localStorage['grvt_ss_on_chain']` exists before saving state.
@@ -542,9 +706,11 @@ class SetupWindow(tk.Toplevel):
         """Callback when login completes."""
         status_var = self.acc1_qr_status if account_num == 1 else self.acc2_qr_status
         self._login_in_progress.discard(account_num)
+        # Drop any coalesced progress message so it can't overwrite the final status.
+        self._status_last.pop(account_num, None)
         self._set_account_buttons_enabled(account_num, True)
 
-        status_var.set(msg[:80])
+        status_var.set(_status_line(msg))
 
         if cookie:
             # QR is one-time use; we already cleared it when the login started.
@@ -563,7 +729,7 @@ class SetupWindow(tk.Toplevel):
 
     def _remove_session(self, account_num: int) -> None:
         """Remove session file with confirmation."""
-        state_path = SESSION_DIR / f"grvt_browser_state_{account_num}.json"
+        state_path = self._state_paths[account_num]
 
         if not state_path.exists():
             messagebox.showinfo("Info", _("setup.no_session", n=account_num))
@@ -588,7 +754,7 @@ class SetupWindow(tk.Toplevel):
 
     def _check_sessions(self) -> None:
         for num, status_var in [(1, self.acc1_session_status), (2, self.acc2_session_status)]:
-            path = SESSION_DIR / f"grvt_browser_state_{num}.json"
+            path = self._state_paths[num]
             # Setup requires signer key to place orders.
             valid, err = validate_state_file_ext(path, require_session_key=True)
             if not valid:
@@ -631,12 +797,13 @@ class SubaccountSelectDialog(tk.Toplevel):
         self._list = tk.Listbox(outer, height=10)
         self._list.pack(fill=tk.BOTH, expand=True, pady=10)
 
-        for i, sa in enumerate(subs):
-            name = sa.get("name") or ""
-            sid = sa.get("chainSubAccountID") or ""
-            sub_id = sa.get("id") or ""
-            label = f"{i+1}. {name}  |  chainSubAccountID={sid}  |  {sub_id}"
-            self._list.insert(tk.END, label)
+        labels = [
+            f"{i+1}. {sa.get('name') or ''}  |  chainSubAccountID={sa.get('chainSubAccountID') or ''}  |  {sa.get('id') or ''}"
+            for i, sa in enumerate(subs)
+        ]
+        # Listbox.insert takes many items at once: one Tcl call instead of one per subaccount.
+        if labels:
+            self._list.insert(tk.END, *labels)
 
         if subs:
             self._list.selection_set(0)
@@ -668,6 +835,139 @@ class SubaccountSelectDialog(tk.Toplevel):
         self.destroy()
 
 
+@functools.lru_cache(maxsize=1)
+def _bitmapinfo_type():
+    """BITMAPINFO ctypes struct for `_gdi_grab`, defined once (Windows only)."""
+    import ctypes
+    from ctypes import wintypes
+
+    class BITMAPINFOHEADER(ctypes.Structure):
+        _fields_ = [
+            ("biSize", wintypes.DWORD),
+            ("biWidth", wintypes.LONG),
+            ("biHeight", wintypes.LONG),
+            ("biPlanes", wintypes.WORD),
+            ("biBitCount", wintypes.WORD),
+            ("biCompression", wintypes.DWORD),
+            ("biSizeImage", wintypes.DWORD),
+            ("biXPelsPerMeter", wintypes.LONG),
+            ("biYPelsPerMeter", wintypes.LONG),
+            ("biClrUsed", wintypes.DWORD),
+            ("biClrImportant", wintypes.DWORD),
+        ]
+
+    class BITMAPINFO(ctypes.Structure):
+        _fields_ = [("bmiHeader", BITMAPINFOHEADER), ("bmiColors", wintypes.DWORD * 3)]
+
+    return BITMAPINFO
+
+
+def _gdi_grab(x: int, y: int, w: int, h: int) -> "Image.Image":
+    """Win32 GDI capture of a screen region. Avoids Pillow's intermittent 'bad window path'."""
+    import ctypes
+    from PIL import Image
+
+    user32, gdi32 = _win32_dlls()
+
+    SRCCOPY = 0x00CC0020
+    DIB_RGB_COLORS = 0
+
+    hdc = user32.GetDC(None)
+    if not hdc:
+        raise OSError("GetDC failed")
+    mdc = gdi32.CreateCompatibleDC(hdc)
+    if not mdc:
+        user32.ReleaseDC(None, hdc)
+        raise OSError("CreateCompatibleDC failed")
+
+    bmi = _bitmapinfo_type()()
+    bmi.bmiHeader.biSize = ctypes.sizeof(bmi.bmiHeader)
+    bmi.bmiHeader.biWidth = w
+    bmi.bmiHeader.biHeight = -h  # top-down
+    bmi.bmiHeader.biPlanes = 1
+    bmi.bmiHeader.biBitCount = 32
+    bmi.bmiHeader.biCompression = 0  # BI_RGB
+
+    # A DIB section's pixels live in memory we can read directly, so BitBlt lands in the
+    # final buffer without a device-dependent bitmap + GetDIBits readback.
+    bits = ctypes.c_void_p()
+    bmp = gdi32.CreateDIBSection(hdc, ctypes.byref(bmi), DIB_RGB_COLORS, ctypes.byref(bits), None, 0)
+    if not bmp or not bits.value:
+        if bmp:
+            gdi32.DeleteObject(bmp)
+        gdi32.DeleteDC(mdc)
+        user32.ReleaseDC(None, hdc)
+        raise OSError("CreateDIBSection failed")
+
+    old = gdi32.SelectObject(mdc, bmp)
+    try:
+        if not gdi32.BitBlt(mdc, 0, 0, w, h, hdc, x, y, SRCCOPY):
+            raise OSError("BitBlt failed")
+        gdi32.GdiFlush()
+
+        # Copy out before the section is freed below.
+        buf = ctypes.string_at(bits.value, w * h * 4)
+        return Image.frombuffer("RGB", (w, h), buf, "raw", "BGRX", 0, 1)
+    finally:
+        try:
+            gdi32.SelectObject(mdc, old)
+        except Exception:
+            pass
+        gdi32.DeleteObject(bmp)
+        gdi32.DeleteDC(mdc)
+        try:
+            user32.ReleaseDC(None, hdc)
+        except Exception:
+            pass
+
+
+def _expand_and_clamp_bbox(
+    left: int, top: int, right: int, bottom: int, limit_w: int, limit_h: int, pad_px: int
+) -> tuple[int, int, int, int]:
+    # Expand by padding, then clamp by shifting the bbox back onto the screen if needed.
+    l = left - pad_px
+    t = top - pad_px
+    r = right + pad_px
+    b = bottom + pad_px
+
+    if l < 0:
+        r -= l
+        l = 0
+    if t < 0:
+        b -= t
+        t = 0
+    if r > limit_w:
+        overflow = r - limit_w
+        l -= overflow
+        r = limit_w
+        if l < 0:
+            l = 0
+    if b > limit_h:
+        overflow = b - limit_h
+        t -= overflow
+        b = limit_h
+        if t < 0:
+            t = 0
+
+    l = max(0, min(l, limit_w - 1))
+    t = max(0, min(t, limit_h - 1))
+    r = max(l + 1, min(r, limit_w))
+    b = max(t + 1, min(b, limit_h))
+    return int(l), int(t), int(r), int(b)
+
+
+def _scale_capture_bbox(
+    x1: int, y1: int, x2: int, y2: int, scale_x: float, scale_y: float, limit_w: int, limit_h: int
+) -> tuple[int, int, int, int]:
+    """Map a Tk selection onto a capture backend's pixel grid, padded (>=48px) and clamped to the screen."""
+    sel_w = max(1, int((x2 - x1) * scale_x))
+    sel_h = max(1, int((y2 - y1) * scale_y))
+    pad = max(48, int(min(sel_w, sel_h) * 0.35))
+    return _expand_and_clamp_bbox(
+        int(x1 * scale_x), int(y1 * scale_y), int(x2 * scale_x), int(y2 * scale_y), limit_w, limit_h, pad
+    )
+
+
 class QRRegionSelector(tk.Toplevel):
     """Fullscreen overlay for selecting QR code region."""
 
@@ -728,29 +1028,18 @@ class QRRegionSelector(tk.Toplevel):
         except Exception:
             pass
 
+        def capture_delay_ms(attempt: int) -> int:
+            # Give the compositor time to fully remove the overlay (longer on each retry).
+            return 260 + (attempt - 1) * 150
+
         def do_capture(attempt: int = 1) -> None:
             try:
-                from PIL import Image, ImageGrab
-                import ctypes
-                from ctypes import wintypes
-
-                # Give the compositor time to fully remove the overlay.
-                time.sleep(0.25 + (attempt - 1) * 0.15)
+                from PIL import ImageGrab
 
                 tk_w = max(1, int(self.winfo_screenwidth()))
                 tk_h = max(1, int(self.winfo_screenheight()))
 
-                user32 = ctypes.WinDLL("user32", use_last_error=True)
-                gdi32 = ctypes.WinDLL("gdi32", use_last_error=True)
-
-                # Fix ctypes prototypes (avoid 64-bit overflow / "bad window path"-like failures).
-                user32.GetDC.argtypes = [wintypes.HWND]
-                user32.GetDC.restype = wintypes.HDC
-                user32.ReleaseDC.argtypes = [wintypes.HWND, wintypes.HDC]
-                user32.ReleaseDC.restype = ctypes.c_int
-
-                gdi32.GetDeviceCaps.argtypes = [wintypes.HDC, ctypes.c_int]
-                gdi32.GetDeviceCaps.restype = ctypes.c_int
+                user32, gdi32 = _win32_dlls()
 
                 # Determine coordinate system sizes for each capture backend:
                 # - GDI uses the DC logical resolution (HORZRES/VERTRES) unless DPI awareness is enabled.
@@ -785,177 +1074,14 @@ class QRRegionSelector(tk.Toplevel):
                     except Exception:
                         grab_w, grab_h = gdi_w, gdi_h
 
-                def _expand_and_clamp_bbox(
-                    left: int, top: int, right: int, bottom: int, limit_w: int, limit_h: int, pad_px: int
-                ) -> tuple[int, int, int, int]:
-                    # Expand by padding, then clamp by shifting the bbox back onto the screen if needed.
-                    l = left - pad_px
-                    t = top - pad_px
-                    r = right + pad_px
-                    b = bottom + pad_px
-
-                    if l < 0:
-                        r -= l
-                        l = 0
-                    if t < 0:
-                        b -= t
-                        t = 0
-                    if r > limit_w:
-                        overflow = r - limit_w
-                        l -= overflow
-                        r = limit_w
-                        if l < 0:
-                            l = 0
-                    if b > limit_h:
-                        overflow = b - limit_h
-                        t -= overflow
-                        b = limit_h
-                        if t < 0:
-                            t = 0
-
-                    l = max(0, min(l, limit_w - 1))
-                    t = max(0, min(t, limit_h - 1))
-                    r = max(l + 1, min(r, limit_w))
-                    b = max(t + 1, min(b, limit_h))
-                    return int(l), int(t), int(r), int(b)
-
                 # Convert Tk logical coords to backend coords, then add generous padding.
                 scale_gdi_x = gdi_w / tk_w
                 scale_gdi_y = gdi_h / tk_h
                 scale_grab_x = grab_w / tk_w
                 scale_grab_y = grab_h / tk_h
 
-                sel_w_gdi = max(1, int((x2 - x1) * scale_gdi_x))
-                sel_h_gdi = max(1, int((y2 - y1) * scale_gdi_y))
-                pad_gdi = max(48, int(min(sel_w_gdi, sel_h_gdi) * 0.35))
-
-                gdi_l = int(x1 * scale_gdi_x)
-                gdi_t = int(y1 * scale_gdi_y)
-                gdi_r = int(x2 * scale_gdi_x)
-                gdi_b = int(y2 * scale_gdi_y)
-                gx1, gy1, gx2, gy2 = _expand_and_clamp_bbox(gdi_l, gdi_t, gdi_r, gdi_b, gdi_w, gdi_h, pad_gdi)
-
-                sel_w_grab = max(1, int((x2 - x1) * scale_grab_x))
-                sel_h_grab = max(1, int((y2 - y1) * scale_grab_y))
-                pad_grab = max(48, int(min(sel_w_grab, sel_h_grab) * 0.35))
-
-                grab_l = int(x1 * scale_grab_x)
-                grab_t = int(y1 * scale_grab_y)
-                grab_r = int(x2 * scale_grab_x)
-                grab_b = int(y2 * scale_grab_y)
-                bx1, by1, bx2, by2 = _expand_and_clamp_bbox(grab_l, grab_t, grab_r, grab_b, grab_w, grab_h, pad_grab)
-
-                def _gdi_grab(x: int, y: int, w: int, h: int) -> Image.Image:
-                    """Win32 GDI capture of a screen region. Avoids Pillow's intermittent 'bad window path'."""
-                    SRCCOPY = 0x00CC0020
-                    DIB_RGB_COLORS = 0
-
-                    class BITMAPINFOHEADER(ctypes.Structure):
-                        _fields_ = [
-                            ("biSize", wintypes.DWORD),
-                            ("biWidth", wintypes.LONG),
-                            ("biHeight", wintypes.LONG),
-                            ("biPlanes", wintypes.WORD),
-                            ("biBitCount", wintypes.WORD),
-                            ("biCompression", wintypes.DWORD),
-                            ("biSizeImage", wintypes.DWORD),
-                            ("biXPelsPerMeter", wintypes.LONG),
-                            ("biYPelsPerMeter", wintypes.LONG),
-                            ("biClrUsed", wintypes.DWORD),
-                            ("biClrImportant", wintypes.DWORD),
-                        ]
-
-                    class BITMAPINFO(ctypes.Structure):
-                        _fields_ = [("bmiHeader", BITMAPINFOHEADER), ("bmiColors", wintypes.DWORD * 3)]
-
-                    user32 = ctypes.WinDLL("user32", use_last_error=True)
-                    gdi32 = ctypes.WinDLL("gdi32", use_last_error=True)
-
-                    user32.GetDC.argtypes = [wintypes.HWND]
-                    user32.GetDC.restype = wintypes.HDC
-                    user32.ReleaseDC.argtypes = [wintypes.HWND, wintypes.HDC]
-                    user32.ReleaseDC.restype = ctypes.c_int
-
-                    gdi32.CreateCompatibleDC.argtypes = [wintypes.HDC]
-                    gdi32.CreateCompatibleDC.restype = wintypes.HDC
-                    gdi32.DeleteDC.argtypes = [wintypes.HDC]
-                    gdi32.DeleteDC.restype = ctypes.c_int
-
-                    gdi32.CreateCompatibleBitmap.argtypes = [wintypes.HDC, ctypes.c_int, ctypes.c_int]
-                    gdi32.CreateCompatibleBitmap.restype = wintypes.HANDLE
-
-                    gdi32.SelectObject.argtypes = [wintypes.HDC, wintypes.HANDLE]
-                    gdi32.SelectObject.restype = wintypes.HANDLE
-                    gdi32.DeleteObject.argtypes = [wintypes.HANDLE]
-                    gdi32.DeleteObject.restype = ctypes.c_int
-
-                    gdi32.BitBlt.argtypes = [
-                        wintypes.HDC,
-                        ctypes.c_int,
-                        ctypes.c_int,
-                        ctypes.c_int,
-                        ctypes.c_int,
-                        wintypes.HDC,
-                        ctypes.c_int,
-                        ctypes.c_int,
-                        wintypes.DWORD,
-                    ]
-                    gdi32.BitBlt.restype = wintypes.BOOL
-
-                    gdi32.GetDIBits.argtypes = [
-                        wintypes.HDC,
-                        wintypes.HANDLE,
-                        wintypes.UINT,
-                        wintypes.UINT,
-                        ctypes.c_void_p,
-                        ctypes.c_void_p,
-                        wintypes.UINT,
-                    ]
-                    gdi32.GetDIBits.restype = ctypes.c_int
-
-                    hdc = user32.GetDC(None)
-                    if not hdc:
-                        raise OSError("GetDC failed")
-                    mdc = gdi32.CreateCompatibleDC(hdc)
-                    if not mdc:
-                        user32.ReleaseDC(None, hdc)
-                        raise OSError("CreateCompatibleDC failed")
-                    bmp = gdi32.CreateCompatibleBitmap(hdc, w, h)
-                    if not bmp:
-                        gdi32.DeleteDC(mdc)
-                        user32.ReleaseDC(None, hdc)
-                        raise OSError("CreateCompatibleBitmap failed")
-
-                    old = gdi32.SelectObject(mdc, bmp)
-                    try:
-                        if not gdi32.BitBlt(mdc, 0, 0, w, h, hdc, x, y, SRCCOPY):
-                            raise OSError("BitBlt failed")
-
-                        bmi = BITMAPINFO()
-                        bmi.bmiHeader.biSize = ctypes.sizeof(BITMAPINFOHEADER)
-                        bmi.bmiHeader.biWidth = w
-                        bmi.bmiHeader.biHeight = -h  # top-down
-                        bmi.bmiHeader.biPlanes = 1
-                        bmi.bmiHeader.biBitCount = 32
-                        bmi.bmiHeader.biCompression = 0  # BI_RGB
-                        buf = ctypes.create_string_buffer(w * h * 4)
-
-                        lines = gdi32.GetDIBits(mdc, bmp, 0, h, buf, ctypes.byref(bmi), DIB_RGB_COLORS)
-                        if lines != h:
-                            raise OSError("GetDIBits failed")
-
-                        return Image.frombuffer("RGB", (w, h), buf, "raw", "BGRX", 0, 1)
-                    finally:
-                        try:
-                            gdi32.SelectObject(mdc, old)
-                        except Exception:
-                            pass
-                        gdi32.DeleteObject(bmp)
-                        gdi32.DeleteDC(mdc)
-                        try:
-                            user32.ReleaseDC(None, hdc)
-                        except Exception:
-                            pass
+                gx1, gy1, gx2, gy2 = _scale_capture_bbox(x1, y1, x2, y2, scale_gdi_x, scale_gdi_y, gdi_w, gdi_h)
+                bx1, by1, bx2, by2 = _scale_capture_bbox(x1, y1, x2, y2, scale_grab_x, scale_grab_y, grab_w, grab_h)
 
                 gw = max(1, gx2 - gx1)
                 gh = max(1, gy2 - gy1)
@@ -1018,7 +1144,7 @@ class QRRegionSelector(tk.Toplevel):
                 # Retry a few times for transient "bad window path" capture failures.
                 if attempt < 6:
                     try:
-                        self._parent.after(10, lambda: do_capture(attempt + 1))
+                        self._parent.after(capture_delay_ms(attempt + 1), lambda: do_capture(attempt + 1))
                         return
                     except Exception:
                         pass
@@ -1031,7 +1157,7 @@ class QRRegionSelector(tk.Toplevel):
 
         # Schedule capture after returning control to the Tk loop.
         try:
-            self._parent.after(10, do_capture)
+            self._parent.after(capture_delay_ms(1), do_capture)
         except Exception:
             do_capture()
 
@@ -3918,6 +4044,7 @@ class VolumeBoostGUI:
 
 def main() -> None:
     # Entry point for `python -m grvt_volume_boost.gui_multi_market`.
+    load_dotenv(".env")
     VolumeBoostGUI().run()
 
 
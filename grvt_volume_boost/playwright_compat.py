@@ -1,8 +1,9 @@
 from __future__ import annotations
 
 import asyncio
+import functools
 from concurrent.futures import ThreadPoolExecutor
-from typing import Callable, TypeVar
+from typing import Any, Callable, TypeVar
 
 _T = TypeVar("_T")
 
@@ -21,3 +22,14 @@ def run_sync_playwright(fn: Callable[[], _T]) -> _T:
     with ThreadPoolExecutor(max_workers=1) as ex:
         return ex.submit(fn).result()
 
+
+
+@functools.lru_cache(maxsize=1)
+def get_stealth() -> Any:
+    """Shared `playwright_stealth.Stealth` config (imported lazily, created once per process).
+
+    Hooking still has to happen per Playwright instance via `hook_playwright_context(p)`.
+    """
+    from playwright_stealth import Stealth
+
+    return Stealth()
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import functools
 import os
 import sys
 from pathlib import Path
@@ -18,12 +19,14 @@ def _exe_dir() -> Path:
     return Path(__file__).resolve().parent.parent
 
 
+@functools.lru_cache(maxsize=1)
 def ensure_playwright_browsers_path() -> None:
     """Point Playwright to a bundled browsers folder when running as an EXE.
 
     For a true "one-click" Windows experience we ship a Chromium build next to the EXE
     under `playwright-browsers/`. When this folder exists, set
     PLAYWRIGHT_BROWSERS_PATH so Playwright can find it without downloading.
+    Only the first call does any work; the result is memoized for the process.
     """
     # Respect an explicit user override.
     if os.getenv("PLAYWRIGHT_BROWSERS_PATH"):
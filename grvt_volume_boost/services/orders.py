@@ -1,10 +1,12 @@
 from __future__ import annotations
 
+import functools
 import random
 import time
-from decimal import Decimal, ROUND_DOWN
+from decimal import Decimal
 from typing import Callable
 
+from grvt_volume_boost import json_compat
 from grvt_volume_boost.clients.trades import post
 from grvt_volume_boost.config import AccountConfig
 from grvt_volume_boost.logging_utils import debug
@@ -18,7 +20,7 @@ def ping_auth(acc: AccountConfig, cookie: str) -> bool:
         r = post("/lite/v1/account_summary", acc=acc, cookie=cookie, payload={"sa": acc.sub_account_id}, timeout=15)
         if r.status_code != 200:
             return False
-        data = r.json()
+        data = json_compat.loads(r.content)
         return isinstance(data, dict) and ("r" in data or "result" in data)
     except Exception as e:
         debug("ping_auth failed", exc=e)
@@ -35,7 +37,7 @@ def get_margin_ratio(acc: AccountConfig, cookie: str) -> float | None:
             payload={"sub_account_id": acc.sub_account_id},
             timeout=30,
         )
-        data = r.json()
+        data = json_compat.loads(r.content)
         if "result" not in data:
             return None
         equity = Decimal(data["result"].get("total_equity") or data["result"].get("equity") or "0")
@@ -56,7 +58,7 @@ def get_position_size(acc: AccountConfig, cookie: str, instrument: str) -> Decim
             payload={"sub_account_id": acc.sub_account_id},
             timeout=30,
         )
-        data = r.json()
+        data = json_compat.loads(r.content)
         if "result" not in data:
             return None
         for p in data["result"]:
@@ -80,7 +82,7 @@ def get_all_positions_map(acc: AccountConfig, cookie: str) -> dict[str, Decimal]
             payload={"sub_account_id": acc.sub_account_id},
             timeout=30,
         )
-        data = r.json()
+        data = json_compat.loads(r.content)
         if "result" not in data:
             return None
         out: dict[str, Decimal] = {}
@@ -107,7 +109,7 @@ def cancel_order(acc: AccountConfig, cookie: str, order_id: str) -> bool:
             payload={"order_id": order_id, "sub_account_id": acc.sub_account_id},
             timeout=30,
         )
-        return r.status_code == 200 and "result" in r.json()
+        return r.status_code == 200 and "result" in json_compat.loads(r.content)
     except Exception as e:
         debug("cancel_order failed", exc=e)
         return False
@@ -136,7 +138,7 @@ def get_open_orders(acc: AccountConfig, cookie: str, instrument: str | None = No
         if instrument:
             payload["instrument"] = instrument
         r = post("/full/v1/open_orders", acc=acc, cookie=cookie, payload=payload, timeout=30)
-        data = r.json()
+        data = json_compat.loads(r.content)
         if "result" in data:
             return data["result"]
         return []
@@ -159,7 +161,7 @@ def get_all_initial_leverage(acc: AccountConfig, cookie: str) -> list[dict] | No
             payload={"sa": acc.sub_account_id},
             timeout=30,
         )
-        data = r.json()
+        data = json_compat.loads(r.content)
         res = data.get("r") if isinstance(data, dict) else None
         if isinstance(res, list):
             return res
@@ -183,7 +185,7 @@ def set_initial_leverage(acc: AccountConfig, cookie: str, *, instrument: str, le
             payload={"sa": acc.sub_account_id, "i": instrument, "l": str(leverage)},
             timeout=30,
         )
-        data = r.json()
+        data = json_compat.loads(r.content)
         # Lite response shape for this endpoint is often {"s": true}.
         if r.status_code != 200 or not isinstance(data, dict):
             return False
@@ -238,6 +240,11 @@ def ensure_initial_leverage(
     return None
 
 
+@functools.lru_cache(maxsize=256)
+def _asset_id(inst_hash: str) -> int:
+    return int(inst_hash, 16) if inst_hash.startswith("0x") else int(inst_hash)
+
+
 def build_create_order_payload(
     *,
     acc: AccountConfig,
@@ -255,17 +262,17 @@ def build_create_order_payload(
     expiration_ns: int | None = None,
 ) -> dict:
     base_decimals = int(inst_info["base_decimals"])
-    inst_hash = inst_info["instrument_hash"]
-    asset_id = int(inst_hash, 16) if str(inst_hash).startswith("0x") else int(inst_hash)
+    asset_id = _asset_id(str(inst_info["instrument_hash"]))
 
-    contract_size = int((size * (Decimal(10) ** base_decimals)).to_integral_value(rounding=ROUND_DOWN))
+    # scaleb shifts the exponent (no multiply); int() truncates toward zero like ROUND_DOWN.
+    contract_size = int(size.scaleb(base_decimals))
 
     limit_price = 0
     if not is_market:
-        limit_price = int((price * (Decimal(10) ** 9)).to_integral_value(rounding=ROUND_DOWN))  # 9 decimals
+        limit_price = int(price.scaleb(9))  # 9 decimals
 
     if nonce is None:
-        nonce = random.randint(0, 2**32 - 1)
+        nonce = random.getrandbits(32)
     if expiration_ns is None:
         # Docs: unix nanoseconds, capped at 30 days.
         # Use a conservative default and allow overrides via GRVT_SIGNATURE_EXPIRATION_SEC.
@@ -340,7 +347,7 @@ def _create_order(acc: AccountConfig, cookie: str, payload: dict) -> dict | None
         try:
             r = post("/lite/v1/create_order", acc=acc, cookie=cookie, payload=payload, timeout=30)
             if r.status_code != 503:
-                return r.json()
+                return json_compat.loads(r.content)
         except Exception as e:
             debug("_create_order failed", exc=e)
             pass
@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import functools
+
 from eth_account import Account as EthAccount
 from eth_account.messages import encode_typed_data
 
@@ -26,16 +28,19 @@ EIP712_ORDER_TYPE = {
 }
 
 
+_EIP712_DOMAIN = {"name": "GRVT Exchange", "version": "0", "chainId": CHAIN_ID}
+
+
+@functools.lru_cache(maxsize=8)
+def _signer(private_key: str):
+    # Key parsing + public-key derivation is the expensive part of from_key; do it once per session key.
+    return EthAccount.from_key(private_key)
+
+
 def sign_order(acc: AccountConfig, message_data: dict) -> tuple[str, dict]:
     """Return (signer_address, signature_fields_dict) for message_data."""
-    account = EthAccount.from_key(acc.session_private_key)
-    signed = account.sign_message(
-        encode_typed_data(
-            {"name": "GRVT Exchange", "version": "0", "chainId": CHAIN_ID},
-            EIP712_ORDER_TYPE,
-            message_data,
-        )
-    )
+    account = _signer(acc.session_private_key)
+    signed = account.sign_message(encode_typed_data(_EIP712_DOMAIN, EIP712_ORDER_TYPE, message_data))
     sig = {
         "s": account.address,
         "r": "0x" + hex(signed.r)[2:].zfill(64),
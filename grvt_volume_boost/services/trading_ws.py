@@ -1,15 +1,14 @@
 from __future__ import annotations
 
 import asyncio
-import json
 import random
-import time
 from dataclasses import dataclass
 from decimal import Decimal
 from typing import Any, Callable
 
 import websockets
 
+from grvt_volume_boost import json_compat
 from grvt_volume_boost.clients.market_data import get_instrument, get_ticker
 from grvt_volume_boost.clients.trades import post as trades_post
 from grvt_volume_boost.services.orders import (
@@ -20,7 +19,7 @@ from grvt_volume_boost.services.orders import (
 )
 from grvt_volume_boost.sizing import mid_price_from_ticker, normalize_size
 from grvt_volume_boost.settings import WS_URL
-from grvt_volume_boost.util import deep_contains
+from grvt_volume_boost.util import deep_contains, deep_contains_any, ws_result
 from grvt_volume_boost.ws_compat import connect as ws_connect
 
 
@@ -123,14 +122,14 @@ async def ws_connect_and_subscribe(
         close_timeout=2,
     )
     await ws.send(
-        json.dumps(
+        json_compat.dumps(
             {
                 "jsonrpc": "2.0",
                 "method": "subscribe",
                 "params": {"stream": stream, "selectors": selectors},
                 "id": request_id,
             }
-        )
+        ).decode()
     )
     return ws
 
@@ -194,8 +193,9 @@ async def place_far_limit_then_cancel(
     on_event: Callable[[str], None],
 ) -> None:
     """Place a far-away post-only limit order, observe it on WS, then cancel it."""
-    inst_info = get_instrument(instrument)
-    ticker = get_ticker(instrument)
+    inst_info, ticker = await asyncio.gather(
+        asyncio.to_thread(get_instrument, instrument), asyncio.to_thread(get_ticker, instrument)
+    )
     mid = mid_price_from_ticker(ticker)
     tick = _decimal_field(inst_info, "tick_size", "0.0")
     min_notional = _decimal_field(inst_info, "min_notional", "0")
@@ -213,7 +213,7 @@ async def place_far_limit_then_cancel(
     if far_price <= 0:
         raise RuntimeError(f"Computed far price invalid: {far_price}")
 
-    nonce = random.randint(0, 2**32 - 1)
+    nonce = random.getrandbits(32)
     intent = LimitOrderIntent(instrument=instrument, size=size, is_buying=is_buying, price=far_price, nonce=nonce)
     payload = _build_order_payload(
         acc=acc,
@@ -239,13 +239,17 @@ async def place_far_limit_then_cancel(
         stream="v1.order",
         selectors=[f"{acc.sub_account_id}-{instrument}"],
     )
+    loop = asyncio.get_running_loop()
     try:
-        r = trades_post("/lite/v1/create_order", acc=acc, cookie=cookie, payload=payload, timeout=30)
+        # Blocking HTTP runs off the event loop so WS frames keep being read meanwhile.
+        r = await asyncio.to_thread(
+            trades_post, "/lite/v1/create_order", acc=acc, cookie=cookie, payload=payload, timeout=30
+        )
         try:
-            created = r.json()
+            created = json_compat.loads(r.content)
         except Exception:
             created = {"status_code": r.status_code, "text": r.text}
-        on_event("[REST] create_order response:\n" + json.dumps(created, indent=2) + "\n")
+        on_event("[REST] create_order response:\n" + json_compat.dumps(created, indent=True).decode() + "\n")
 
         if r.status_code != 200:
             return
@@ -253,34 +257,39 @@ async def place_far_limit_then_cancel(
         # Build a few string needles to match WS payload (format varies).
         size_needles = {str(intent.size), str(intent.size.normalize()), f"{intent.size:f}".rstrip("0").rstrip(".")}
         price_needles = {str(intent.price), str(intent.price.normalize()), f"{intent.price:f}".rstrip("0").rstrip(".")}
+        # All needles are collected in a single walk of each update's keys and string values.
+        nonce_s = str(intent.nonce)
+        needles = tuple(dict.fromkeys((nonce_s, intent.instrument, *price_needles, *size_needles)))
 
         oid: str | None = None
-        start = time.time()
+        deadline = loop.time() + 15.0
         seen = 0
         last_order_data: dict | None = None
-        while time.time() - start < 15.0:
+        while (remaining := deadline - loop.time()) > 0:
+            # One timer per frame for the rest of the window, instead of waking every second.
             try:
-                raw = await asyncio.wait_for(ws.recv(), timeout=1.0)
-            except TimeoutError:
-                continue
+                raw = await asyncio.wait_for(ws.recv(), timeout=remaining)
+            except asyncio.TimeoutError:
+                break
             try:
-                msg = json.loads(raw)
-            except json.JSONDecodeError:
+                msg = json_compat.loads(raw)
+            except json_compat.JSONDecodeError:
                 continue
 
-            order_data = msg.get("params", {}).get("result", msg.get("result", msg))
+            order_data = ws_result(msg)
             if not isinstance(order_data, dict):
                 continue
             seen += 1
             last_order_data = order_data
 
-            if _deep_contains(order_data, str(intent.nonce)) or (
-                _deep_contains(order_data, intent.instrument)
-                and any(_deep_contains(order_data, n) for n in price_needles)
-                and any(_deep_contains(order_data, n) for n in size_needles)
+            hits = deep_contains_any(order_data, needles)
+            if nonce_s in hits or (
+                intent.instrument in hits
+                and not hits.isdisjoint(price_needles)
+                and not hits.isdisjoint(size_needles)
             ):
                 oid = _extract_oid(order_data)
-                on_event("[WS] matched order update:\n" + json.dumps(order_data, indent=2) + "\n")
+                on_event("[WS] matched order update:\n" + json_compat.dumps(order_data, indent=True).decode() + "\n")
                 break
 
         if not oid:
@@ -289,27 +298,28 @@ async def place_far_limit_then_cancel(
             else:
                 on_event("[WS] Could not determine order_id/oid from WS.\n")
                 if last_order_data:
-                    on_event("[WS] Last order message seen:\n" + json.dumps(last_order_data, indent=2) + "\n")
-            ok_all = cancel_all_orders(acc, cookie)
+                    on_event("[WS] Last order message seen:\n" + json_compat.dumps(last_order_data, indent=True).decode() + "\n")
+            ok_all = await asyncio.to_thread(cancel_all_orders, acc, cookie)
             on_event(f"[CANCEL] cancel_all_orders fallback => {ok_all}\n")
             return
 
-        ok = cancel_order(acc, cookie, oid)
+        ok = await asyncio.to_thread(cancel_order, acc, cookie, oid)
         on_event(f"[CANCEL] cancel_order({oid}) => {ok}\n")
 
-        start = time.time()
-        while time.time() - start < 10.0:
+        deadline = loop.time() + 10.0
+        while (remaining := deadline - loop.time()) > 0:
+            # One timer per frame for the rest of the window, instead of waking every second.
             try:
-                raw = await asyncio.wait_for(ws.recv(), timeout=1.0)
-            except TimeoutError:
-                continue
+                raw = await asyncio.wait_for(ws.recv(), timeout=remaining)
+            except asyncio.TimeoutError:
+                break
             try:
-                msg = json.loads(raw)
-            except json.JSONDecodeError:
+                msg = json_compat.loads(raw)
+            except json_compat.JSONDecodeError:
                 continue
-            order_data = msg.get("params", {}).get("result", msg.get("result", msg))
-            if isinstance(order_data, dict) and _deep_contains(order_data, oid):
-                on_event("[WS] update after cancel:\n" + json.dumps(order_data, indent=2) + "\n")
+            order_data = ws_result(msg)
+            if isinstance(order_data, dict) and deep_contains(order_data, oid):
+                on_event("[WS] update after cancel:\n" + json_compat.dumps(order_data, indent=True).decode() + "\n")
                 break
     finally:
         try:
@@ -326,8 +336,11 @@ async def close_position_if_any(
     on_event: Callable[[str], None],
 ) -> bool:
     """If there's a position, close it with a reduce-only market order (and observe it on WS)."""
-    inst_info = get_instrument(instrument)
-    pos = get_position_size(acc, cookie, instrument)
+    # Both lookups are blocking REST calls: run them concurrently, off the event loop.
+    inst_info, pos = await asyncio.gather(
+        asyncio.to_thread(get_instrument, instrument),
+        asyncio.to_thread(get_position_size, acc, cookie, instrument),
+    )
     if pos is None:
         raise RuntimeError("Failed to read position (auth/cookie issue?)")
     if pos == 0:
@@ -336,7 +349,7 @@ async def close_position_if_any(
 
     size = abs(Decimal(pos))
     is_buying = pos < 0  # if short: buy to close; if long: sell to close
-    nonce = random.randint(0, 2**32 - 1)
+    nonce = random.getrandbits(32)
     on_event(
         f"[POS] Closing {instrument} pos={pos} with MARKET {'BUY' if is_buying else 'SELL'} "
         f"size={size} nonce={nonce}\n"
@@ -361,27 +374,35 @@ async def close_position_if_any(
         stream="v1.order",
         selectors=[f"{acc.sub_account_id}-{instrument}"],
     )
+    loop = asyncio.get_running_loop()
     try:
-        r = trades_post("/lite/v1/create_order", acc=acc, cookie=cookie, payload=payload, timeout=30)
+        # Blocking HTTP runs off the event loop so WS frames keep being read meanwhile.
+        r = await asyncio.to_thread(
+            trades_post, "/lite/v1/create_order", acc=acc, cookie=cookie, payload=payload, timeout=30
+        )
         try:
-            created = r.json()
+            created = json_compat.loads(r.content)
         except Exception:
             created = {"status_code": r.status_code, "text": r.text}
-        on_event("[REST] create_order response:\n" + json.dumps(created, indent=2) + "\n")
+        on_event("[REST] create_order response:\n" + json_compat.dumps(created, indent=True).decode() + "\n")
 
-        start = time.time()
-        while time.time() - start < 10.0:
+        close_needles = (str(nonce), instrument)
+        deadline = loop.time() + 10.0
+        while (remaining := deadline - loop.time()) > 0:
+            # One timer per frame for the rest of the window, instead of waking every second.
             try:
-                raw = await asyncio.wait_for(ws.recv(), timeout=1.0)
-            except TimeoutError:
-                continue
+                raw = await asyncio.wait_for(ws.recv(), timeout=remaining)
+            except asyncio.TimeoutError:
+                break
             try:
-                msg = json.loads(raw)
-            except json.JSONDecodeError:
+                msg = json_compat.loads(raw)
+            except json_compat.JSONDecodeError:
+                continue
+            order_data = ws_result(msg)
+            if not isinstance(order_data, dict):
                 continue
-            order_data = msg.get("params", {}).get("result", msg.get("result", msg))
-            if isinstance(order_data, dict) and _deep_contains(order_data, str(nonce)) and _deep_contains(order_data, instrument):
-                on_event("[WS] matched close update:\n" + json.dumps(order_data, indent=2) + "\n")
+            if len(deep_contains_any(order_data, close_needles)) == len(close_needles):
+                on_event("[WS] matched close update:\n" + json_compat.dumps(order_data, indent=True).decode() + "\n")
                 break
     finally:
         try:
@@ -146,6 +146,9 @@ def _fmt_decimal(d: Decimal) -> str:
 def _round_to_tick(price: Decimal, tick: Decimal, *, rounding) -> Decimal:
     if tick <= 0:
         return price
+    if tick.as_tuple().digits == (1,):
+        # Power-of-ten tick (0.01, 1, ...): a single quantize is the same rounding.
+        return price.quantize(tick, rounding=rounding)
     steps = (price / tick).to_integral_value(rounding=rounding)
     return (steps * tick).quantize(tick, rounding=ROUND_DOWN)
 
@@ -1,27 +1,64 @@
 from __future__ import annotations
 
+import os
+import threading
+from pathlib import Path
 from typing import Any
 
 
+def env_flag(name: str) -> bool:
+    """True unless env var `name` is unset/empty or one of 0/false/no/off (case-insensitive)."""
+    return (os.getenv(name) or "").strip().lower() not in ("", "0", "false", "no", "off")
+
+
+def atomic_write_bytes(path: Path, data: bytes) -> None:
+    """Write via temp file + rename so readers never observe a partially written file."""
+    tmp = path.with_suffix(f"{path.suffix}.tmp.{os.getpid()}.{threading.get_ident()}")
+    try:
+        with open(tmp, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            tmp.unlink()
+        except OSError:
+            pass
+        raise
+
+
 def deep_contains(obj: Any, needle: str) -> bool:
     """Best-effort recursive search for `needle` in dict/list/strings.
 
     Used for matching GRVT WS payloads which can vary by environment/version.
     """
-    if obj is None:
-        return False
-    if isinstance(obj, str):
-        return needle in obj
-    if isinstance(obj, (int, float, bool)):
-        return False
-    if isinstance(obj, dict):
-        for k, v in obj.items():
-            if isinstance(k, str) and needle in k:
-                return True
-            if deep_contains(v, needle):
-                return True
-        return False
-    if isinstance(obj, list):
-        return any(deep_contains(v, needle) for v in obj)
-    return False
+    return bool(deep_contains_any(obj, (needle,)))
+
+
+def deep_contains_any(obj: Any, needles: tuple[str, ...]) -> set[str]:
+    """Return the subset of `needles` found in dict keys/string values of `obj`, in one traversal."""
+    found: set[str] = set()
+    stack = [obj]
+    while stack and len(found) < len(needles):
+        o = stack.pop()
+        if isinstance(o, str):
+            found.update(n for n in needles if n in o)
+        elif isinstance(o, dict):
+            for k in o:
+                if isinstance(k, str):
+                    found.update(n for n in needles if n in k)
+            stack.extend(o.values())
+        elif isinstance(o, list):
+            stack.extend(o)
+    return found
+
 
+def ws_result(msg: Any) -> Any:
+    """Unwrap a GRVT WS frame: `params.result`, else top-level `result`, else the message itself."""
+    if not isinstance(msg, dict):
+        return None
+    params = msg.get("params")
+    if isinstance(params, dict) and "result" in params:
+        return params["result"]
+    return msg.get("result", msg)
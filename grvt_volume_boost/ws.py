@@ -10,7 +10,7 @@ from typing import Callable
 import websockets
 
 from grvt_volume_boost.settings import WS_URL
-from grvt_volume_boost.util import deep_contains
+from grvt_volume_boost.util import deep_contains, ws_result
 from grvt_volume_boost.ws_compat import connect as ws_connect
 
 
@@ -352,7 +352,7 @@ class OrderStreamClient:
             msg = json.loads(raw)
         except Exception:
             return
-        order_data = msg.get("params", {}).get("result", msg.get("result", msg))
+        order_data = ws_result(msg)
         if not isinstance(order_data, dict):
             return
         feed = order_data.get("feed", order_data)
@@ -443,7 +443,7 @@ async def wait_for_order_on_book(
                 try:
                     msg = await asyncio.wait_for(ws.recv(), timeout=0.5)
                     data = json.loads(msg)
-                    order_data = data.get("params", {}).get("result", data.get("result", data))
+                    order_data = ws_result(data)
 
                     if isinstance(order_data, dict):
                         feed = order_data.get("feed", order_data)
@@ -502,7 +502,7 @@ async def wait_for_order_on_book_by_client_co(
                 try:
                     msg = await asyncio.wait_for(ws.recv(), timeout=0.5)
                     data = json.loads(msg)
-                    order_data = data.get("params", {}).get("result", data.get("result", data))
+                    order_data = ws_result(data)
                     if not isinstance(order_data, dict):
                         continue
 
@@ -523,7 +523,8 @@ async def wait_for_order_on_book_by_client_co(
                     want = str(client_co)
                     got = _extract_client_co_any(feed, order_data)
 
-                    if (got is not None and str(got) == want) or _deep_contains(feed, want) or _deep_contains(order_data, want):
+                    # `feed` is order_data itself or nested inside it, so one scan of order_data covers both.
+                    if (got is not None and str(got) == want) or _deep_contains(order_data, want):
                         return True
                 except asyncio.TimeoutError:
                     continue
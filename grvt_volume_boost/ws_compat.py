@@ -16,8 +16,14 @@ else:
     _HEADERS_KW = None
 
 
+# GRVT frames are small JSON; permessage-deflate costs more CPU per frame than it saves.
+_SUPPORTS_COMPRESSION_KW = "compression" in _CONNECT_PARAMS
+
+
 def connect(uri: str, *, headers: Mapping[str, str] | None = None, **kwargs: Any):
     """Compatibility wrapper around websockets.connect for auth headers."""
+    if _SUPPORTS_COMPRESSION_KW:
+        kwargs.setdefault("compression", None)
     if headers is None or _HEADERS_KW is None:
         return websockets.connect(uri, **kwargs)
     return websockets.connect(uri, **{_HEADERS_KW: dict(headers)}, **kwargs)
@@ -13,6 +13,7 @@ import websockets
 
 from grvt_volume_boost.services.orders import get_open_orders
 from grvt_volume_boost.settings import WS_URL
+from grvt_volume_boost.util import ws_result
 from grvt_volume_boost.ws_compat import connect as ws_connect
 
 if TYPE_CHECKING:
@@ -172,7 +173,7 @@ class PositionWSManager:
         """Process a WS message and update state."""
         try:
             msg = json.loads(raw)
-            order_data = msg.get("params", {}).get("result", msg.get("result", msg))
+            order_data = ws_result(msg)
             if not isinstance(order_data, dict):
                 return
 